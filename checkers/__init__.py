@@ -0,0 +1,10 @@
+""" Checkers on a small board: position representation, evaluations and search engines.
+
+Importing the package only builds its lookup tables. The command line tools are separate modules:
+python -m checkers.play, checkers.arena, checkers.benchmark, checkers.tablebase, checkers.book,
+checkers.tuning, checkers.records, checkers.warmup, checkers.server and checkers.loadgen.
+"""
+from .core import COMPUTER, HUMAN, EMPTY, Board, make_board, initial_board, print_board, get_valid_moves, move_piece
+from .engine import Engine, SearchResult, find_move
+from .evaluation import EVALUATIONS
+from .search_context import SearchContext
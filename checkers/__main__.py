@@ -0,0 +1,4 @@
+import runpy
+
+# python -m checkers plays a game, like python -m checkers.play
+runpy.run_module('checkers.play', run_name='__main__')
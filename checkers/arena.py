@@ -0,0 +1,141 @@
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .core import BOARD_SIZE, COMPUTER, HUMAN, initial_board, is_terminal_state, get_valid_moves, move_piece
+from .engine import PRESETS, Engine
+from .records import GameWriter
+
+PLAYER_NAMES = {COMPUTER: 'computer', HUMAN: 'human'}
+
+
+def parse_policy(spec):
+    """ 'alphabeta:6' -> ('alphabeta', 6); the depth may be left out, e.g. 'greedy'. """
+    name, _, depth = spec.partition(':')
+    if name not in PRESETS:
+        raise argparse.ArgumentTypeError(f'unknown policy {name!r}, expected one of {", ".join(PRESETS)}')
+    return name, int(depth) if depth else PRESETS[name]['depth']
+
+
+# engines of this process, by policy, player and board size; a process plays many games, so their tables are kept
+# between moves, but no two sides share one: the tables of one side would hand it the other side's searches
+_engines = {}
+
+
+def choose_move(policy, board, player):
+    """
+
+    :param policy: (name, depth) as returned by parse_policy
+    :param board:
+    :param player: Player to move
+    :return: (move or None, number of nodes searched)
+    """
+    name, depth = policy
+    key = name, depth, player, board.size
+    if key not in _engines:
+        _engines[key] = Engine(**{**PRESETS[name], 'depth': depth})
+    result = _engines[key].search(board, player, depth)
+    return result.move, result.context.no_of_nodes
+
+
+def play_game(game_id, computer_policy, human_policy, seed, opening_plies=2, max_plies=200, board_size=BOARD_SIZE):
+    """ Play one game without any input or output; the human moves first, as in play_game.
+
+    The first opening_plies moves are random, drawn from seed, so games between the same policies differ.
+    A player left without a move loses, which is how the engines score it. A game reaching max_plies is a draw.
+    """
+    rng = random.Random(seed)
+    board = initial_board(board_size)
+    policies = {COMPUTER: computer_policy, HUMAN: human_policy}
+    player, moves, winner, reason = HUMAN, [], None, None
+    while True:
+        if is_terminal_state(board):
+            human_goal = board.geometry.goal_masks[HUMAN]
+            winner = HUMAN if board.pieces[HUMAN] & human_goal == human_goal else COMPUTER
+            reason = 'goal row'
+            break
+        if len(moves) >= max_plies:
+            reason = 'ply limit'
+            break
+        valid_moves = get_valid_moves(board, player)
+        if not valid_moves:
+            winner, reason = 1 - player, 'no moves'
+            break
+        start = time.perf_counter()
+        if len(moves) < opening_plies:
+            move, nodes = rng.choice(valid_moves), 0
+        else:
+            move, nodes = choose_move(policies[player], board, player)
+        moves.append({'player': PLAYER_NAMES[player], 'move': move, 'nodes': nodes,
+                      'seconds': time.perf_counter() - start})
+        move_piece(board, move)
+        player = 1 - player
+
+    return {
+        'game': game_id,
+        'seed': seed,
+        'board_size': board_size,
+        'computer': ':'.join(map(str, computer_policy)),
+        'human': ':'.join(map(str, human_policy)),
+        'winner': PLAYER_NAMES.get(winner, 'draw'),
+        'reason': reason,
+        'plies': len(moves),
+        'moves': moves,
+    }
+
+
+def run_arena(policy_a, policy_b, games, output_path, workers=None, seed=0, opening_plies=2, max_plies=200,
+              board_size=BOARD_SIZE, record_path=None):
+    """ Play games between two policies in worker processes, switching sides every game.
+
+    Every finished game is appended to output_path as one JSON line, in the order the games finish, and to the game
+    file record_path, if given, in the compact form of checkers.records.
+
+    :return: Counter of wins per policy, and of draws
+    """
+    results = Counter()
+    winners = {name: player for player, name in PLAYER_NAMES.items()}
+    writer = None if record_path is None else GameWriter(record_path, board_size)
+    with ProcessPoolExecutor(workers) as pool, open(output_path, 'a') as output:
+        futures = []
+        for game_id in range(games):
+            computer_policy, human_policy = (policy_a, policy_b) if game_id % 2 == 0 else (policy_b, policy_a)
+            futures.append(pool.submit(play_game, game_id, computer_policy, human_policy, seed + game_id,
+                                       opening_plies, max_plies, board_size))
+        for future in as_completed(futures):
+            record = future.result()
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+            if writer is not None:
+                writer.append([tuple(move['move']) for move in record['moves']], winners.get(record['winner']),
+                              first_player=HUMAN)
+            results[record[record['winner']] if record['winner'] != 'draw' else 'draw'] += 1
+    if writer is not None:
+        writer.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play engines against each other without a human.')
+    parser.add_argument('policy_a', type=parse_policy, help=f'one of {", ".join(PRESETS)}, optionally :depth')
+    parser.add_argument('policy_b', type=parse_policy)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, defaults to the CPU count')
+    parser.add_argument('--output', default='arena.jsonl', help='JSON lines file the games are appended to')
+    parser.add_argument('--record', help='game file to append the games to as well, see checkers.records')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--opening-plies', type=int, default=2, help='random moves at the start of every game')
+    parser.add_argument('--max-plies', type=int, default=200, help='games this long are called a draw')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_arena(args.policy_a, args.policy_b, args.games, args.output, args.workers, args.seed,
+                        args.opening_plies, args.max_plies, args.board_size, args.record)
+    elapsed = time.perf_counter() - start
+    for outcome, count in results.most_common():
+        print(f'{outcome}: {count}')
+    print(f'{args.games} games in {elapsed:.1f}s, {args.games / elapsed:.1f} games/s')
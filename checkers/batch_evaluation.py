@@ -0,0 +1,84 @@
+import numpy as np
+
+from .core import BOARD_SIZE, COMPUTER, HUMAN, EMPTY, get_valid_moves, apply_move
+
+# positions are stacked as an int8 array of shape (N, size, size) holding COMPUTER, HUMAN and EMPTY;
+# every heuristic returns one value per position, equal to what checkers.evaluation computes for it
+
+
+def _bits(masks, size):
+    """ (N, size * size) array of the bits of masks, which may be wider than 64 bits. """
+    no_of_bytes = (size * size + 7) // 8
+    data = b''.join(int(mask).to_bytes(no_of_bytes, 'little') for mask in masks)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(-1, no_of_bytes), axis=1, bitorder='little')
+    return bits[:, :size * size].astype(bool)
+
+
+def grids_from_masks(computer, human, size=BOARD_SIZE):
+    """ Stack positions of one board size given as sequences of the players' bitmasks. """
+    grids = np.full((len(computer), size * size), EMPTY, dtype=np.int8)
+    if len(computer):
+        grids[_bits(computer, size)] = COMPUTER
+        grids[_bits(human, size)] = HUMAN
+    return grids.reshape(-1, size, size)
+
+
+def stack_boards(boards):
+    """ Stack boards, which all have to be of the same size. """
+    boards = list(boards)
+    size = boards[0].size if boards else BOARD_SIZE
+    return grids_from_masks([board.pieces[COMPUTER] for board in boards], [board.pieces[HUMAN] for board in boards],
+                            size)
+
+
+def simple_heuristics(grids):
+    size = grids.shape[1]
+    # weight of a piece in the simple heuristic: its distance to the last row
+    row_weights = ((size - 1) - np.arange(size)).reshape(1, size, 1)
+    return size * (size - 1) - ((grids != EMPTY) * row_weights).sum(axis=(1, 2))
+
+
+def advancing_moves(grids, player):
+    """ Number of moves taking one of player's pieces one row closer to its goal row, per position. """
+    if player == COMPUTER:  # the computer advances towards the last row
+        pieces, empty = grids[:, :-1, :] == player, grids[:, 1:, :] == EMPTY
+    else:
+        pieces, empty = grids[:, 1:, :] == player, grids[:, :-1, :] == EMPTY
+    straight = (pieces & empty).sum(axis=(1, 2))
+    left = (pieces[:, :, 1:] & empty[:, :, :-1]).sum(axis=(1, 2))
+    right = (pieces[:, :, :-1] & empty[:, :, 1:]).sum(axis=(1, 2))
+    return straight + left + right
+
+
+def complex_heuristics(grids, player):
+    """ get_complex_heuristic for every position, with player being the one at the leaf. """
+    heuristic = simple_heuristics(grids).astype(np.float64)
+    no_of_advancing_moves = advancing_moves(grids, COMPUTER if player == HUMAN else HUMAN).astype(np.float64)
+    # np.where evaluates every branch, including the ones it then discards for dividing by zero
+    with np.errstate(divide='ignore'):
+        if player == HUMAN:
+            return np.where((heuristic == 0.0) & (no_of_advancing_moves == 0), 0.0,
+                            - 1 / (0.4 * heuristic + 0.6 * no_of_advancing_moves))
+        return np.where(heuristic == 0.0,
+                        np.where(no_of_advancing_moves == 0, 0.0, 1 / 0.6 * no_of_advancing_moves),
+                        1 / (1 / 0.4 * heuristic + 0.6 * no_of_advancing_moves))
+
+
+def evaluate_batch(grids):
+    """
+
+    :param grids: Stacked positions, see stack_boards and grids_from_masks
+    :return: (simple heuristics, complex heuristics with the computer at the leaf, complex heuristics with the human)
+    """
+    return simple_heuristics(grids), complex_heuristics(grids, COMPUTER), complex_heuristics(grids, HUMAN)
+
+
+def evaluate_children(board, player, leaf_player):
+    """ Make every move of player and evaluate all the resulting leaves in one call.
+
+    :return: (moves, complex heuristic of the board after each move, as seen by leaf_player)
+    """
+    moves = get_valid_moves(board, player)
+    if not moves:
+        return moves, np.empty(0)
+    return moves, complex_heuristics(stack_boards(apply_move(board, move) for move in moves), leaf_player)
@@ -0,0 +1,193 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from math import inf
+
+from .core import EMPTY, HUMAN, COMPUTER, initial_board, make_board, is_terminal_state, get_valid_moves, move_piece
+from .engine import PRESETS, Engine
+
+# (name, board, player to move)
+CORPUS = [
+    ('start', initial_board(), COMPUTER),
+    ('example_board', make_board([
+        [EMPTY, EMPTY, EMPTY, EMPTY, ],
+        [EMPTY, COMPUTER, HUMAN, EMPTY, ],
+        [HUMAN, HUMAN, EMPTY, HUMAN, ],
+        [COMPUTER, COMPUTER, COMPUTER, EMPTY, ],
+    ]), HUMAN),
+    ('example_board_max', make_board([
+        [EMPTY, EMPTY, EMPTY, EMPTY, ],
+        [EMPTY, COMPUTER, HUMAN, EMPTY, ],
+        [HUMAN, HUMAN, EMPTY, HUMAN, ],
+        [COMPUTER, COMPUTER, COMPUTER, EMPTY, ],
+    ]), COMPUTER),
+    ('crossed', make_board([
+        [HUMAN, HUMAN, COMPUTER, HUMAN, ],
+        [COMPUTER, COMPUTER, EMPTY, COMPUTER, ],
+        [EMPTY, EMPTY, EMPTY, HUMAN, ],
+        [EMPTY, EMPTY, EMPTY, EMPTY, ],
+    ]), COMPUTER),
+    ('midgame', make_board([
+        [COMPUTER, EMPTY, EMPTY, COMPUTER, ],
+        [EMPTY, COMPUTER, HUMAN, EMPTY, ],
+        [EMPTY, HUMAN, COMPUTER, EMPTY, ],
+        [HUMAN, EMPTY, EMPTY, HUMAN, ],
+    ]), COMPUTER),
+]
+
+# engine preset -> depths to search
+ENGINES = {
+    'minimax': (1, 2, 3),
+    'alphabeta': (2, 4, 6),
+    'alphabeta-complex': (2, 4, 6),
+    'alphabeta-selective': (2, 4, 6),
+    'failsoft': (2, 4, 6),
+    'pvs': (2, 4, 6),
+    'pvs-aspiration': (2, 4, 6),
+    'alphabeta-weighted': (2, 4, 6),
+}
+
+
+def measure(engine_name, position_name, board, player, depth, repeat=3):
+    """ Search one position; counters come from the last run and the wall time is the fastest of repeat runs.
+
+    Every run starts from a new engine, so that every measurement searches the same tree.
+    """
+    seconds = inf
+    for _ in range(repeat):
+        engine = Engine(**PRESETS[engine_name])
+        start = time.perf_counter()
+        result = engine.search(board, player, depth)
+        seconds = min(seconds, time.perf_counter() - start)
+    context = result.context
+    nodes = context.no_of_nodes
+    return {
+        'engine': engine_name,
+        'position': position_name,
+        'depth': depth,
+        'value': result.score,
+        'nodes': nodes,
+        'leaves': context.leaves,
+        'prunes': context.prunes,
+        'tt_hits': context.tt_hits,
+        # b such that a uniform tree with branching factor b has as many nodes as were searched: b ** depth = nodes
+        'branching_factor': nodes ** (1 / depth),
+        'seconds': seconds,
+        'nodes_per_second': nodes / seconds if seconds else inf,
+    }
+
+
+def run(engines=ENGINES, repeat=3):
+    return [measure(engine_name, position_name, board, player, depth, repeat)
+            for engine_name in engines
+            for position_name, board, player in CORPUS
+            for depth in ENGINES[engine_name]]
+
+
+def random_game(size, seed=0, max_plies=None):
+    """ Positions of a game of random moves on a size x size board, the initial one first. """
+    rng = random.Random(seed)
+    board, player = initial_board(size), COMPUTER
+    positions = [(board.copy(), player)]
+    while len(positions) < (max_plies or 4 * size) and not is_terminal_state(board):
+        moves = get_valid_moves(board, player)
+        if not moves:
+            break
+        move_piece(board, rng.choice(moves))
+        player = 1 - player
+        positions.append((board.copy(), player))
+    return positions
+
+
+def measure_scaling(engine_name, size, depth, repeat=3):
+    """ Speed and memory of move generation and search on a size x size board.
+
+    Searches start from the middle of a random game; memory is the peak traced while searching, which leaves out the
+    transposition table's slots, allocated with the engine, but counts the entries stored in them.
+    """
+    positions = random_game(size)
+    board, player = positions[len(positions) // 2]
+    no_of_calls = 1000
+    movegen_seconds = inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(no_of_calls // len(positions) + 1):
+            for position, position_player in positions:
+                get_valid_moves(position, position_player)
+        movegen_seconds = min(movegen_seconds, time.perf_counter() - start)
+    no_of_calls = (no_of_calls // len(positions) + 1) * len(positions)
+
+    result = measure(engine_name, f'random_game_{size}x{size}', board, player, depth, repeat)
+    engine = Engine(**PRESETS[engine_name])
+    tracemalloc.start()
+    engine.search(board, player, depth)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result.update({
+        'board_size': size,
+        'move_generations_per_second': no_of_calls / movegen_seconds,
+        'peak_memory_bytes': peak_memory,
+    })
+    return result
+
+
+def compare(results, baseline, time_tolerance=0.2, min_seconds=0.005):
+    """ Regressions against a baseline: any growth in searched nodes, or wall time growing beyond time_tolerance.
+
+    Searches that took less than min_seconds in the baseline are too noisy to compare their time.
+
+    :return: List of messages, empty if nothing regressed
+    """
+    previous = {(r['engine'], r['position'], r['depth']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['engine'], result['position'], result['depth']))
+        if old is None:
+            continue
+        name = f"{result['engine']} {result['position']} depth {result['depth']}"
+        if result['nodes'] > old['nodes']:
+            regressions.append(f"{name}: {old['nodes']} -> {result['nodes']} nodes")
+        if old['seconds'] >= min_seconds and result['seconds'] > old['seconds'] * (1 + time_tolerance):
+            regressions.append(f"{name}: {old['seconds'] * 1000:.2f} -> {result['seconds'] * 1000:.2f} ms")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the search engines on a fixed set of positions.')
+    parser.add_argument('--engine', action='append', choices=ENGINES, help='engine to run, all of them by default')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the fastest one counts')
+    parser.add_argument('--output', help='write the results to this JSON file instead of stdout')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to check for regressions')
+    parser.add_argument('--time-tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--board-sizes', type=int, nargs='+',
+                        help='instead of the corpus, measure how the engines scale with these board sizes')
+    parser.add_argument('--depth', type=int, default=4, help='search depth of the --board-sizes measurements')
+    args = parser.parse_args()
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    if args.board_sizes:
+        report['results'] = [measure_scaling(engine_name, size, args.depth, args.repeat)
+                             for engine_name in args.engine or ENGINES
+                             for size in args.board_sizes]
+    else:
+        report['results'] = run(args.engine or ENGINES, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report['results'], json.load(file), args.time_tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,121 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+
+from .core import BOARD_SIZE, is_mirrored, mirror_move, get_valid_moves, tt_key
+from .engine import PRESETS, Engine
+from .warmup import opening_positions
+
+_MAGIC = b'CKB1'
+# magic, board size, number of positions
+_HEADER = struct.Struct('<4sB3xI')
+# move_from, move_to, depth searched, score for the computer
+_RECORD = struct.Struct('<BBBxf')
+
+# a book file is the header, then the keys of its positions as sorted little-endian 64-bit integers, then one record per
+# key in the same order; a position and its mirror image share a key, and moves are stored for the orientation the key
+# stands for
+
+
+def book_key(board, player):
+    """ Key of board with player to move, the same for the board's mirror image. """
+    return tt_key(board, player)[0]
+
+
+def build_book(engine, plies, depth=None, size=BOARD_SIZE, verbose=False):
+    """ Search every position of the first plies moves with engine.
+
+    :return: {book_key: (move in canonical orientation, score, depth)} of every position with a move to make
+    """
+    positions = opening_positions(plies, size)
+    entries = {}
+    start = time.perf_counter()
+    for index, (board, player) in enumerate(positions, 1):
+        key = book_key(board, player)
+        if key not in entries:
+            result = engine.search(board, player, depth)
+            if result.move is not None:
+                move = mirror_move(board, result.move) if is_mirrored(board) else result.move
+                entries[key] = move, result.score, result.depth
+        if verbose and index % 100 == 0:
+            print(f'{index}/{len(positions)} positions, {time.perf_counter() - start:.1f}s')
+    return entries
+
+
+def write_book(path, entries, size=BOARD_SIZE):
+    keys = array('Q', sorted(entries))
+    if sys.byteorder == 'big':
+        keys.byteswap()
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, size, len(keys)))
+        keys.tofile(file)
+        for key in sorted(entries):
+            (move_from, move_to), score, depth = entries[key]
+            file.write(_RECORD.pack(move_from, move_to, depth, score))
+
+
+class OpeningBook:
+    """ Memory-mapped book file written by write_book; a probe is a binary search over its keys. """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self._no_of_positions = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path} is not an opening book')
+        self._records_offset = _HEADER.size + 8 * self._no_of_positions
+        self._keys = memoryview(self._mmap)[_HEADER.size:self._records_offset].cast('Q')
+        if sys.byteorder == 'big':
+            self._keys.release()
+            self._keys = array('Q', self._mmap[_HEADER.size:self._records_offset])
+            self._keys.byteswap()
+
+    def __len__(self):
+        return self._no_of_positions
+
+    def probe(self, board, player):
+        """
+
+        :param board:
+        :param player: Player to move
+        :return: (move, score for the computer, depth it was searched to), None for positions not in the book
+        """
+        if board.size != self.size:
+            return None
+        key = book_key(board, player)
+        index = bisect_left(self._keys, key)
+        if index == self._no_of_positions or self._keys[index] != key:
+            return None
+        move_from, move_to, depth, score = _RECORD.unpack_from(self._mmap, self._records_offset + _RECORD.size * index)
+        move = (move_from, move_to)
+        if is_mirrored(board):
+            move = mirror_move(board, move)
+        # two positions sharing a 64-bit key are unlikely, but a move that can not be made must not be played
+        if move not in get_valid_moves(board, player):
+            return None
+        return move, score, depth
+
+    def close(self):
+        if isinstance(self._keys, memoryview):
+            self._keys.release()
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build an opening book by searching every position of the opening.')
+    parser.add_argument('path', nargs='?', help='book file to write, book_<size>x<size>.bin by default')
+    parser.add_argument('--engine', choices=PRESETS, default='alphabeta-selective')
+    parser.add_argument('--depth', type=int, default=8, help='depth to search every position to')
+    parser.add_argument('--plies', type=int, default=4, help='positions up to this many moves from the start')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    args = parser.parse_args()
+
+    output_path = args.path or f'book_{args.board_size}x{args.board_size}.bin'
+    book_entries = build_book(Engine(**PRESETS[args.engine]), args.plies, args.depth, args.board_size, verbose=True)
+    write_book(output_path, book_entries, args.board_size)
+    print(f'{len(book_entries)} positions written to {output_path}')
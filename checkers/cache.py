@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import time
+
+from .core import canonical_pieces, is_mirrored, mirror_move
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS positions (
+    namespace TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    computer TEXT NOT NULL,
+    human TEXT NOT NULL,
+    player INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score REAL NOT NULL,
+    move_from INTEGER,
+    move_to INTEGER,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, size, computer, human, player)
+);
+CREATE INDEX IF NOT EXISTS positions_last_used ON positions (last_used);
+'''
+
+
+class SearchCache:
+    """ Results of whole searches kept in an SQLite file, shared by every process and run that opens it.
+
+    A position is stored with the deepest search made of it, under a namespace naming the engine settings the result
+    depends on. Mirror images are stored once, in their canonical orientation. The database runs in write-ahead log
+    mode, so any number of processes read it while one writes. Once it holds more than max_entries positions, the least
+    recently used tenth is evicted. Every thread using the cache gets its own connection to the database.
+    """
+
+    def __init__(self, path, max_entries=1000000, size_check_interval=1000, touch_batch=256):
+        """
+
+        :param path: SQLite file, created if it does not exist
+        :param max_entries: Positions kept before the least recently used are evicted; the count is checked every
+         size_check_interval stores, so the file may briefly hold that many more per writing process
+        :param size_check_interval: Stores between two counts of the positions held
+        :param touch_batch: Hits whose last use is kept in memory before they are written in one transaction, so
+         reading the cache does not take the write lock on every hit
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.size_check_interval = size_check_interval
+        self.touch_batch = touch_batch
+        self._puts_since_size_check = 0
+        # key -> time of the hits whose last use is not written yet, shared by the threads under _lock
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # connections of every thread, so close closes them all
+        self._connections = []
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def _connection(self):
+        """ This thread's connection to the database, opened on its first use. """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # every connection waits up to timeout seconds for another's write to finish; each is only used by the
+            # thread that opened it, but may be closed from another one
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _key(namespace, board, player):
+        computer, human = canonical_pieces(board)
+        return namespace, board.size, format(computer, 'x'), format(human, 'x'), player
+
+    def get(self, namespace, board, player, min_depth=0):
+        """
+
+        :param namespace: Engine settings the result was searched with, see Engine.namespace
+        :param board:
+        :param player: Player to move
+        :param min_depth: Shallowest stored search to accept
+        :return: (depth, score, move or None) of the deepest search stored, None if there is none that deep
+        """
+        key = self._key(namespace, board, player)
+        row = self._connection.execute(
+            'SELECT depth, score, move_from, move_to FROM positions '
+            'WHERE namespace = ? AND size = ? AND computer = ? AND human = ? AND player = ?', key).fetchone()
+        if row is None or row[0] < min_depth:
+            return None
+        with self._lock:
+            self._touched[key] = time.time()
+            full = len(self._touched) >= self.touch_batch
+        if full:
+            self._write_touched()
+        depth, score, move_from, move_to = row
+        move = None if move_from is None else (move_from, move_to)
+        return depth, score, mirror_move(board, move) if is_mirrored(board) else move
+
+    def put(self, namespace, board, player, depth, score, move):
+        """ Store the result of a search, unless a deeper one of the same position is stored already. """
+        if is_mirrored(board):
+            move = mirror_move(board, move)
+        move_from, move_to = (None, None) if move is None else move
+        with self._connection:
+            self._connection.execute('BEGIN IMMEDIATE')
+            self._connection.execute(
+                'INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (namespace, size, computer, human, player) DO UPDATE SET '
+                'depth = excluded.depth, score = excluded.score, move_from = excluded.move_from, '
+                'move_to = excluded.move_to, last_used = excluded.last_used '
+                'WHERE excluded.depth >= positions.depth',
+                (*self._key(namespace, board, player), depth, score, move_from, move_to, time.time()))
+            self._puts_since_size_check += 1
+            if self._puts_since_size_check < self.size_check_interval:
+                return
+            self._puts_since_size_check = 0
+            no_of_entries = self._connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+            if no_of_entries > self.max_entries:
+                # evict by the last uses known so far
+                self._write_touched(in_transaction=True)
+                self._connection.execute(
+                    'DELETE FROM positions WHERE rowid IN (SELECT rowid FROM positions ORDER BY last_used LIMIT ?)',
+                    (no_of_entries - self.max_entries + self.max_entries // 10,))
+
+    def _write_touched(self, in_transaction=False):
+        """ Write the last uses of the hits kept in memory, all in one transaction. """
+        with self._lock:
+            rows = [(last_used, *key) for key, last_used in self._touched.items()]
+            self._touched = {}
+        if not rows:
+            return
+        statement = ('UPDATE positions SET last_used = ? '
+                     'WHERE namespace = ? AND size = ? AND computer = ? AND human = ? AND player = ?')
+        if in_transaction:
+            self._connection.executemany(statement, rows)
+            return
+        with self._connection:
+            self._connection.execute('BEGIN IMMEDIATE')
+            self._connection.executemany(statement, rows)
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+
+    def close(self):
+        self._write_touched()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
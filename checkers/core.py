@@ -0,0 +1,412 @@
+import random
+
+BOARD_SIZE = 4  # size of the boards built when no size is given
+COMPUTER, HUMAN, EMPTY = 0, 1, 2
+GLYPHS = ('🔷', '🔴', '⬛')
+DIRECTIONS = [(1, 1), (0, 1), (1, 0), (-1, -1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
+
+
+class Geometry:
+    """ Everything about a size x size board that does not depend on where the pieces are, computed once per size.
+
+    Every square s = i * size + j is one bit of a player's bitmask. Each player starts with size pieces on its own
+    back row - row 0 for the computer, the last row for the human - and wins by filling the other one.
+    """
+
+    def __init__(self, size):
+        if size < 3:
+            raise ValueError(f'boards must be at least 3x3, not {size}x{size}')
+        self.size = size
+        self.squares = range(size * size)
+        self.coordinates = [divmod(s, size) for s in self.squares]
+        self.row_masks = [((1 << size) - 1) << (i * size) for i in range(size)]
+        # goal_masks[player] is the row player has to fill
+        self.goal_masks = (self.row_masks[size - 1], self.row_masks[0])
+        # sum of the distances of the pieces to the last row on the initial board, get_simple_heuristic's starting point
+        self.max_advances = size * (size - 1)
+        # advance_weights[s] is the distance of square s to the last row
+        self.advance_weights = [size - 1 - i for i, j in self.coordinates]
+        self.neighbors, self.neighbor_masks, self.forward_masks = self._build_neighbors()
+        # backward_masks[player][s] holds the squares from which player's pieces advance onto s
+        self.backward_masks = tuple([sum(1 << t for t in self.squares if forward[t] >> s & 1) for s in self.squares]
+                                    for forward in self.forward_masks)
+        # advancing_masks[player][s] = (forward mask of player, backward masks of player and of the opponent), what
+        # move_piece needs of a square to keep the advancing moves of both players counted
+        self.advancing_masks = tuple(
+            [(self.forward_masks[player][s], self.backward_masks[player][s], self.backward_masks[1 - player][s])
+             for s in self.squares] for player in (COMPUTER, HUMAN))
+        # mirror[s] is the square s is reflected onto by the vertical axis of the board, which maps the moves, the goal
+        # rows and both heuristics onto themselves
+        self.mirror = [self.square(i, size - 1 - j) for i, j in self.coordinates]
+        # zobrist[player][s] is xor-ed into a board's key while player has a piece on s; seeded so keys are stable
+        # across runs
+        zobrist_random = random.Random(0x5EED)
+        self.zobrist = [[zobrist_random.getrandbits(64) for s in self.squares] for player in (COMPUTER, HUMAN)]
+        self.zobrist_max_to_move = zobrist_random.getrandbits(64)
+
+    def square(self, i, j):
+        return i * self.size + j
+
+    def mirror_mask(self, mask):
+        mirror = self.mirror
+        mirrored = 0
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            mirrored |= 1 << mirror[low.bit_length() - 1]
+        return mirrored
+
+    def _build_neighbors(self):
+        """ Precompute, for every square, the moves to its in-bounds neighbors.
+
+        Neighbors keep the order of DIRECTIONS so move generation visits moves in the same order as the old
+        list-of-lists engines did.
+        """
+        size = self.size
+        neighbors, neighbor_masks = [], []
+        forward_masks = ([], [])
+        for s in self.squares:
+            i, j = self.coordinates[s]
+            moves, mask, forward = [], 0, [0, 0]
+            for di, dj in DIRECTIONS:
+                if 0 <= i + di < size and 0 <= j + dj < size:
+                    bit = 1 << self.square(i + di, j + dj)
+                    moves.append(((s, self.square(i + di, j + dj)), bit))
+                    mask |= bit
+                    if di == 1:
+                        forward[COMPUTER] |= bit
+                    elif di == -1:
+                        forward[HUMAN] |= bit
+            neighbors.append(tuple(moves))
+            neighbor_masks.append(mask)
+            forward_masks[COMPUTER].append(forward[COMPUTER])
+            forward_masks[HUMAN].append(forward[HUMAN])
+        # neighbors[s] = ((move, bit of destination), ...), forward_masks[player][s] = neighbors one row closer to the
+        # goal
+        return neighbors, neighbor_masks, forward_masks
+
+
+_geometries = {}
+
+
+def get_geometry(size):
+    if size not in _geometries:
+        _geometries[size] = Geometry(size)
+    return _geometries[size]
+
+
+# the tables of the default board, for code that only ever plays on it
+GEOMETRY = get_geometry(BOARD_SIZE)
+SQUARES = GEOMETRY.squares
+COORDINATES = GEOMETRY.coordinates
+ROW_MASKS = GEOMETRY.row_masks
+NEIGHBORS, NEIGHBOR_MASKS, FORWARD_MASKS = GEOMETRY.neighbors, GEOMETRY.neighbor_masks, GEOMETRY.forward_masks
+ZOBRIST = GEOMETRY.zobrist
+# xor-ed into a key to tell apart the same board with the computer (max player) to move; boards of other sizes use
+# it too, so a table must only hold the keys of one board size: engines serving several sizes keep one per size
+ZOBRIST_MAX_TO_MOVE = GEOMETRY.zobrist_max_to_move
+
+
+def square(i, j, size=BOARD_SIZE):
+    return i * size + j
+
+
+def parse_move(move_from, move_to, size=BOARD_SIZE):
+    """ Move between two (i, j) coordinates, or None if either of them is not on the board. """
+    for position in (move_from, move_to):
+        if len(position) != 2 or not all(0 <= x < size for x in position):
+            return None
+    return square(*move_from, size), square(*move_to, size)
+
+
+def scan_advances(computer, human, size=BOARD_SIZE):
+    """ Sum of the distances of all pieces to the last row. """
+    advance_weights = get_geometry(size).advance_weights
+    occupied = computer | human
+    sum_advances = 0
+    while occupied:
+        low = occupied & -occupied
+        occupied ^= low
+        sum_advances += advance_weights[low.bit_length() - 1]
+    return sum_advances
+
+
+def scan_advancing_moves(computer, human, player, size=BOARD_SIZE):
+    """ Number of moves that take one of player's pieces one row closer to its goal row. """
+    empty = ~(computer | human)
+    forward_masks = get_geometry(size).forward_masks[player]
+    pieces = (computer, human)[player]
+    no_of_advancing_moves = 0
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        no_of_advancing_moves += (forward_masks[low.bit_length() - 1] & empty).bit_count()
+    return no_of_advancing_moves
+
+
+def zobrist_key(computer, human, size=BOARD_SIZE):
+    zobrist = get_geometry(size).zobrist
+    key = 0
+    for player, pieces in ((COMPUTER, computer), (HUMAN, human)):
+        while pieces:
+            low = pieces & -pieces
+            pieces ^= low
+            key ^= zobrist[player][low.bit_length() - 1]
+    return key
+
+
+class Board:
+    """ Game state as one bitmask per player: pieces[COMPUTER] and pieces[HUMAN], on a board of geometry.size.
+
+    key is the Zobrist hash of the pieces and mirror_key the one of their mirror image, both kept up to date by
+    move_piece. A board and its mirror image are worth the same, so tables store them once, under canonical_key.
+
+    move_piece also keeps up to date what the heuristics are computed from, so evaluating a board takes no scan of it:
+    advances, the sum of the distances of all pieces to the last row, and advancing[player], the number of moves
+    taking one of player's pieces one row closer to its goal row.
+    """
+    __slots__ = ('pieces', 'key', 'mirror_key', 'geometry', 'advances', 'advancing')
+
+    def __init__(self, computer=0, human=0, key=None, size=BOARD_SIZE):
+        self.pieces = [computer, human]
+        self.key = zobrist_key(computer, human, size) if key is None else key
+        self.geometry = get_geometry(size)
+        self.mirror_key = zobrist_key(self.geometry.mirror_mask(computer), self.geometry.mirror_mask(human), size)
+        self.advances = scan_advances(computer, human, size)
+        self.advancing = [scan_advancing_moves(computer, human, player, size) for player in (COMPUTER, HUMAN)]
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.pieces = self.pieces[:]
+        board.key = self.key
+        board.mirror_key = self.mirror_key
+        board.geometry = self.geometry
+        board.advances = self.advances
+        board.advancing = self.advancing[:]
+        return board
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    def __getitem__(self, position):
+        bit = 1 << self.geometry.square(*position)
+        if self.pieces[COMPUTER] & bit:
+            return COMPUTER
+        if self.pieces[HUMAN] & bit:
+            return HUMAN
+        return EMPTY
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.pieces == other.pieces and self.geometry is other.geometry
+
+    def __hash__(self):
+        return self.key
+
+    def __reduce__(self):
+        return Board, (self.pieces[COMPUTER], self.pieces[HUMAN], self.key, self.geometry.size)
+
+    def __repr__(self):
+        size = '' if self.geometry.size == BOARD_SIZE else f', size={self.geometry.size}'
+        return f'Board(computer={self.pieces[COMPUTER]:#x}, human={self.pieces[HUMAN]:#x}{size})'
+
+
+def make_board(rows):
+    """ Build a board from a square grid of COMPUTER, HUMAN and EMPTY; its size is the number of rows. """
+    size = len(rows)
+    pieces = [0, 0]
+    for i, row in enumerate(rows):
+        for j, piece in enumerate(row):
+            if piece != EMPTY:
+                pieces[piece] |= 1 << square(i, j, size)
+    return Board(*pieces, size=size)
+
+
+def initial_board(size=BOARD_SIZE):
+    geometry = get_geometry(size)
+    return Board(geometry.row_masks[0], geometry.row_masks[size - 1], size=size)
+
+
+def print_board(board):
+    for i in range(board.size):
+        for j in range(board.size):
+            print(GLYPHS[board[i, j]], end=" ")
+        print()
+    print()
+
+
+def is_terminal_state(board):
+    goal_masks = board.geometry.goal_masks
+    return (board.pieces[HUMAN] & goal_masks[HUMAN] == goal_masks[HUMAN]
+            or board.pieces[COMPUTER] & goal_masks[COMPUTER] == goal_masks[COMPUTER])
+
+
+def get_winner(board, player):
+    """ Winner of the game on board with player to move, None while the game goes on.
+
+    A player wins by filling their goal row, and loses when left without a move.
+    """
+    if is_terminal_state(board):
+        human_goal = board.geometry.goal_masks[HUMAN]
+        return HUMAN if board.pieces[HUMAN] & human_goal == human_goal else COMPUTER
+    if not has_valid_move(board, player):
+        return 1 - player
+    return None
+
+
+def canonical_key(board):
+    """ The same key for a board and its mirror image. """
+    return min(board.key, board.mirror_key)
+
+
+def is_mirrored(board):
+    """ Whether board is the mirror image of the orientation its canonical_key stands for. """
+    return board.mirror_key < board.key
+
+
+def tt_key(board, player):
+    """ Transposition table key of board with player to move, the same for the board's mirror image.
+
+    :return: (key, whether board is mirrored), the moves stored under the key being those of the orientation it
+     stands for
+    """
+    mirrored = board.mirror_key < board.key
+    key = board.mirror_key if mirrored else board.key
+    return (key ^ ZOBRIST_MAX_TO_MOVE if player == COMPUTER else key), mirrored
+
+
+def mirror_move(board, move):
+    """ move reflected like board's mirror image; None stays None. """
+    if move is None:
+        return None
+    mirror = board.geometry.mirror
+    return mirror[move[0]], mirror[move[1]]
+
+
+def canonical_pieces(board):
+    """ (computer, human) bitmasks of the orientation of board its canonical_key stands for. """
+    if is_mirrored(board):
+        return board.geometry.mirror_mask(board.pieces[COMPUTER]), board.geometry.mirror_mask(board.pieces[HUMAN])
+    return board.pieces[COMPUTER], board.pieces[HUMAN]
+
+
+def get_neighbors(board, s):
+    """ Empty squares a piece standing on square s can move to. """
+    occupied = board.pieces[COMPUTER] | board.pieces[HUMAN]
+    return [move[1] for move, bit in board.geometry.neighbors[s] if not occupied & bit]
+
+
+def get_valid_moves(board, player):
+    """
+
+    :param board:
+    :param player:
+    :return: List of moves (from_square, to_square), pieces visited in row-major order
+    """
+    occupied = board.pieces[COMPUTER] | board.pieces[HUMAN]
+    pieces = board.pieces[player]
+    neighbors = board.geometry.neighbors
+    valid_moves = []
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        for move, bit in neighbors[low.bit_length() - 1]:
+            if not occupied & bit:
+                valid_moves.append(move)
+    return valid_moves
+
+
+def iter_valid_moves(board, player, first=None):
+    """ The moves of get_valid_moves, generated one at a time, so a search that stops early - at a cutoff - generates
+    only the moves it visits.
+
+    Moves may be made on board between two moves of the iteration, as long as they are undone before the next one is
+    asked for.
+
+    :param first: Move to yield before the others, if it is one of them, e.g. the best move stored for the position
+    """
+    if first is not None:
+        if is_valid_move(board, player, first):
+            yield first
+        else:
+            first = None
+    occupied = board.pieces[COMPUTER] | board.pieces[HUMAN]
+    pieces = board.pieces[player]
+    neighbors = board.geometry.neighbors
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        for move, bit in neighbors[low.bit_length() - 1]:
+            if not occupied & bit and move != first:
+                yield move
+
+
+def is_valid_move(board, player, move):
+    """ Whether move is one of player's moves on board, without generating them. """
+    source, destination = move
+    empty = ~(board.pieces[COMPUTER] | board.pieces[HUMAN])
+    return bool(board.pieces[player] >> source & 1
+                and (board.geometry.neighbor_masks[source] & empty) >> destination & 1)
+
+
+def has_valid_move(board, player):
+    """ Whether player has a move to make, without generating any. """
+    empty = ~(board.pieces[COMPUTER] | board.pieces[HUMAN])
+    pieces = board.pieces[player]
+    neighbor_masks = board.geometry.neighbor_masks
+    while pieces:
+        low = pieces & -pieces
+        pieces ^= low
+        if neighbor_masks[low.bit_length() - 1] & empty:
+            return True
+    return False
+
+
+def move_to_front(moves, move):
+    """ Reorder moves in place so that move, if it is one of them, is searched first. """
+    if move is not None and move in moves:
+        moves.remove(move)
+        moves.insert(0, move)
+    return moves
+
+
+# move = (from_square, to_square)
+def move_piece(board, move):
+    source, destination = move
+    pieces = board.pieces
+    player = COMPUTER if pieces[COMPUTER] >> source & 1 else HUMAN
+    move_mask = (1 << source) | (1 << destination)
+    empty = ~(pieces[COMPUTER] | pieces[HUMAN])
+    own = pieces[player] ^ move_mask
+    pieces[player] = own
+    opponent = pieces[1 - player]
+    geometry = board.geometry
+    advancing_masks = geometry.advancing_masks[player]
+    source_forward, source_own, source_opponent = advancing_masks[source]
+    destination_forward, destination_own, destination_opponent = advancing_masks[destination]
+    # the moving piece takes its advancing moves along; the other pieces gain the ones onto source and lose the ones
+    # onto destination
+    own ^= 1 << destination
+    advancing = board.advancing
+    advancing[player] += ((destination_forward & (empty ^ move_mask)).bit_count() - (source_forward & empty).bit_count()
+                          + (own & source_own).bit_count() - (own & destination_own).bit_count())
+    advancing[1 - player] += (opponent & source_opponent).bit_count() - (opponent & destination_opponent).bit_count()
+    board.advances += geometry.advance_weights[destination] - geometry.advance_weights[source]
+    zobrist, mirror = geometry.zobrist[player], geometry.mirror
+    board.key ^= zobrist[source] ^ zobrist[destination]
+    board.mirror_key ^= zobrist[mirror[source]] ^ zobrist[mirror[destination]]
+
+
+def undo_move(board, move):
+    move_piece(board, (move[1], move[0]))
+
+
+def apply_move(board, move):
+    """ New board with move made, board itself is left untouched. """
+    board_copy = board.copy()
+    move_piece(board_copy, move)
+    return board_copy
+
+
+def get_board_states(board, player):
+    return [apply_move(board, move) for move in get_valid_moves(board, player)]
@@ -0,0 +1,245 @@
+from collections import namedtuple
+from math import inf
+
+from .cache import SearchCache
+from .core import COMPUTER, apply_move
+from .evaluation import EVALUATIONS, load_weights
+from .mcts import MonteCarloTreeSearch
+from .move_cache import MoveCache
+from .move_ordering import MoveOrdering
+from .search import STRATEGIES, greedy, minimax, iterative_deepening, principal_variation
+from .search_context import SearchContext
+from .transposition import TranspositionTable
+
+ALGORITHMS = ('greedy', 'minimax', 'alphabeta', 'mcts')
+# deepest iteration of a search limited by time rather than depth
+MAX_DEPTH = 64
+
+# the engines the command line tools know by name
+PRESETS = {
+    'greedy': {'algorithm': 'greedy', 'evaluation': 'simple', 'depth': 1},
+    'minimax': {'algorithm': 'minimax', 'evaluation': 'simple', 'depth': 3},
+    'alphabeta': {'algorithm': 'alphabeta', 'evaluation': 'simple', 'depth': 4},
+    'alphabeta-complex': {'algorithm': 'alphabeta', 'evaluation': 'complex', 'depth': 4, 'move_ordering': False},
+    'alphabeta-selective': {'algorithm': 'alphabeta', 'evaluation': 'simple', 'depth': 4, 'quiescence_depth': 4,
+                            'late_move_reductions': True},
+    'failsoft': {'algorithm': 'alphabeta', 'evaluation': 'simple', 'depth': 4, 'strategy': 'failsoft'},
+    'pvs': {'algorithm': 'alphabeta', 'evaluation': 'simple', 'depth': 4, 'strategy': 'pvs'},
+    'pvs-aspiration': {'algorithm': 'alphabeta', 'evaluation': 'simple', 'depth': 4, 'strategy': 'pvs',
+                       'aspiration_window': 1},
+    'alphabeta-weighted': {'algorithm': 'alphabeta', 'evaluation': 'weighted', 'depth': 4},
+    # the depth of a Monte Carlo tree search is its number of playouts
+    'mcts': {'algorithm': 'mcts', 'evaluation': 'simple', 'depth': 2000, 'playout': 'heuristic'},
+    'mcts-random': {'algorithm': 'mcts', 'evaluation': 'simple', 'depth': 2000, 'playout': 'random'},
+}
+
+# move: best move found, None if the player has no move; score: its value for the computer;
+# depth: depth searched, 0 for moves from the tablebase, playouts run for mcts;
+# context: SearchContext with the statistics of the search;
+# pv: principal variation, the line of play expected from move on, as far as the search knows it
+SearchResult = namedtuple('SearchResult', 'move score depth context pv', defaults=((),))
+
+
+class Engine:
+    """ Chooses moves for positions it is given; a position in, a move and its score out.
+
+    The engine does not keep the game: the only state it carries from one search to the next are its transposition
+    table and move ordering history, which make later searches faster. Engines built with the same options choose the
+    same moves from cold, so options - plain values - are all a worker process needs to build its own.
+    """
+
+    def __init__(self, algorithm='alphabeta', evaluation='complex', depth=4, time_budget_ms=None, move_ordering=True,
+                 tt_capacity=1 << 16, tablebase_path=None, cache_path=None, quiescence_depth=0,
+                 late_move_reductions=False, book_path=None, strategy='failhard', aspiration_window=None,
+                 exploration=1.4, playout='random', seed=0, weights_path=None, move_cache_capacity=0):
+        """
+
+        :param algorithm: One of ALGORITHMS
+        :param evaluation: Name of the evaluation in evaluation.EVALUATIONS
+        :param depth: Depth to search to; for mcts, the number of playouts
+        :param time_budget_ms: Search alpha-beta with iterative deepening for this long instead of to a fixed depth
+        :param move_ordering: Order moves with MoveOrdering, rather than only searching the stored best move first
+        :param tt_capacity: Number of transposition table slots
+        :param tablebase_path: Tablebase file to play the positions it solves perfectly from
+        :param cache_path: SearchCache file to reuse earlier searches from, and store this engine's searches in
+        :param quiescence_depth: Plies past depth to go on searching moves that enter a goal row; alpha-beta only
+        :param late_move_reductions: Search quiet moves late in the move order less deep; alpha-beta only
+        :param book_path: Opening book file to take the moves of the positions it holds from, see checkers.book
+        :param strategy: Alpha-beta variant to search with, one of search.STRATEGIES
+        :param aspiration_window: Search iteratively deeper, each iteration with a window of this half-width around
+         the value of the one before; alpha-beta only
+        :param exploration: UCT exploration constant of mcts
+        :param playout: How mcts plays its playouts, one of mcts.PLAYOUT_POLICIES
+        :param seed: Seed of the random choices of mcts
+        :param weights_path: Weight file of the weighted evaluation to use instead of its default weights, see
+         checkers.tuning
+        :param move_cache_capacity: Positions whose moves alpha-beta with move ordering keeps to search again, see
+         MoveCache; 0 generates them every time
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'unknown algorithm {algorithm!r}, expected one of {", ".join(ALGORITHMS)}')
+        if evaluation not in EVALUATIONS:
+            raise ValueError(f'unknown evaluation {evaluation!r}, expected one of {", ".join(EVALUATIONS)}')
+        if weights_path is not None and evaluation != 'weighted':
+            raise ValueError('weights_path needs the weighted evaluation')
+        if strategy not in STRATEGIES:
+            raise ValueError(f'unknown strategy {strategy!r}, expected one of {", ".join(STRATEGIES)}')
+        if ((quiescence_depth or late_move_reductions or strategy != 'failhard' or aspiration_window is not None)
+                and algorithm != 'alphabeta'):
+            raise ValueError('quiescence_depth, late_move_reductions, strategy and aspiration_window need the '
+                             'alphabeta algorithm')
+        self.options = {
+            'algorithm': algorithm,
+            'evaluation': evaluation,
+            'depth': depth,
+            'time_budget_ms': time_budget_ms,
+            'move_ordering': move_ordering,
+            'tt_capacity': tt_capacity,
+            'tablebase_path': tablebase_path,
+            'cache_path': cache_path,
+            'quiescence_depth': quiescence_depth,
+            'late_move_reductions': late_move_reductions,
+            'book_path': book_path,
+            'strategy': strategy,
+            'aspiration_window': aspiration_window,
+            'exploration': exploration,
+            'playout': playout,
+            'seed': seed,
+            'weights_path': weights_path,
+            'move_cache_capacity': move_cache_capacity,
+        }
+        # the settings that decide the result of a search of a position to a given depth
+        self.namespace = f'{algorithm}/{evaluation}/{"ordered" if move_ordering else "unordered"}'
+        if quiescence_depth:
+            self.namespace += f'/quiescence{quiescence_depth}'
+        if late_move_reductions:
+            self.namespace += '/lmr'
+        if strategy != 'failhard':
+            self.namespace += f'/{strategy}'
+        if aspiration_window is not None:
+            self.namespace += f'/aspiration{aspiration_window}'
+        if algorithm == 'mcts':
+            self.namespace += f'/{playout}/exploration{exploration}/seed{seed}'
+        self.algorithm = algorithm
+        self.evaluation = EVALUATIONS[evaluation] if weights_path is None else load_weights(weights_path)
+        if evaluation == 'weighted':
+            self.namespace += f'/weights-{self.evaluation.version}'
+        self.depth = depth
+        self.time_budget_ms = time_budget_ms
+        self.quiescence_depth = quiescence_depth
+        self.late_move_reductions = late_move_reductions
+        self.strategy = strategy
+        self.aspiration_window = aspiration_window
+        # the tree of a Monte Carlo tree search, kept from one move to the next
+        self.tree = MonteCarloTreeSearch(exploration, playout, seed) if algorithm == 'mcts' else None
+        self.transposition_table = TranspositionTable(tt_capacity)
+        self.move_ordering = MoveOrdering() if move_ordering else None
+        self.move_cache = MoveCache(move_cache_capacity) if move_cache_capacity else None
+        self.tablebase = None
+        if tablebase_path is not None:
+            # imported here so that python -m checkers.tablebase does not find itself imported by the package
+            from .tablebase import Tablebase
+            self.tablebase = Tablebase(tablebase_path)
+        self.book = None
+        if book_path is not None:
+            from .book import OpeningBook
+            self.book = OpeningBook(book_path)
+        self.cache = None if cache_path is None or algorithm == 'greedy' else SearchCache(cache_path)
+
+    def new_context(self, **kwargs):
+        """ SearchContext searching with this engine's evaluation and tables; kwargs go to SearchContext. """
+        return SearchContext(evaluation=self.evaluation, transposition_table=self.transposition_table,
+                             move_ordering=self.move_ordering, tablebase=self.tablebase,
+                             quiescence_depth=self.quiescence_depth, late_move_reductions=self.late_move_reductions,
+                             move_cache=self.move_cache, **kwargs)
+
+    def clear(self):
+        """ Forget everything learnt from earlier searches. """
+        self.transposition_table.clear()
+        if self.tree is not None:
+            self.tree.clear()
+        if self.move_ordering is not None:
+            self.move_ordering.clear()
+        if self.move_cache is not None:
+            self.move_cache.clear()
+
+    def tablebase_move(self, board, player, context):
+        """ SearchResult with the tablebase's perfect move, None if the tablebase does not solve the position. """
+        if self.tablebase is None:
+            return None
+        move = self.tablebase.best_move(board, player)
+        if move is None:
+            return None
+        return SearchResult(move, self.tablebase.score(apply_move(board, move), 1 - player), 0, context, (move,))
+
+    def book_move(self, board, player, context):
+        """ SearchResult with the opening book's move, None if the book does not hold the position. """
+        if self.book is None:
+            return None
+        probe = self.book.probe(board, player)
+        if probe is None:
+            return None
+        move, score, depth = probe
+        return SearchResult(move, score, depth, context, (move,))
+
+    def search(self, board, player, depth=None, time_budget_ms=None, trace=None, context=None):
+        """ Choose a move for player; board is left as it was.
+
+        :param board:
+        :param player: Player to move
+        :param depth: Depth to search to instead of the engine's
+        :param time_budget_ms: Time budget instead of the engine's; the search then goes as deep as it can
+        :param trace: Trace hook for the search, see SearchContext
+        :param context: Context from new_context to search with, e.g. one another thread may stop; trace is then
+         ignored
+        :return: SearchResult
+        """
+        context = self.new_context(trace=trace) if context is None else context
+        result = self.tablebase_move(board, player, context) or self.book_move(board, player, context)
+        if result is not None:
+            return result
+
+        is_max_player = player == COMPUTER
+        depth = self.depth if depth is None else depth
+        time_budget_ms = self.time_budget_ms if time_budget_ms is None else time_budget_ms
+        if self.cache is not None:
+            # a search at least as deep as the one asked for - or than the engine's own depth, for searches limited
+            # by time - is as good an answer
+            cached = self.cache.get(self.namespace, board, player, depth)
+            if cached is not None:
+                cached_depth, score, move = cached
+                return SearchResult(move, score, cached_depth, context, () if move is None else (move,))
+
+        board = board.copy()
+        strategy = STRATEGIES[self.strategy]
+        if self.algorithm == 'greedy':
+            value, move = greedy(board, player, context)
+            depth = 1
+        elif self.algorithm == 'minimax':
+            value, move = minimax(board, depth, is_max_player, context)
+        elif self.algorithm == 'mcts':
+            # a time budget makes the search anytime: it then runs as many playouts as fit
+            value, move, pv = self.tree.search(board, player, context, depth if time_budget_ms is None else None,
+                                               time_budget_ms)
+            depth = context.leaves
+        elif time_budget_ms is not None or self.aspiration_window is not None:
+            value, move, depth = iterative_deepening(board, time_budget_ms, is_max_player, context,
+                                                     MAX_DEPTH if time_budget_ms is not None else depth, strategy,
+                                                     self.aspiration_window)
+        else:
+            value, move = strategy(board, depth, is_max_player, -inf, +inf, context)
+        if self.cache is not None and move is not None:
+            self.cache.put(self.namespace, board, player, depth, value, move)
+        if self.algorithm == 'alphabeta':
+            pv = principal_variation(board, player, move, depth, context)
+        elif self.algorithm != 'mcts':
+            pv = () if move is None else (move,)
+        return SearchResult(move, value, depth, context, pv)
+
+
+def find_move(board, player, **options):
+    """ Search board with a new Engine built from options, sharing nothing with any other search.
+
+    :return: SearchResult
+    """
+    return Engine(**options).search(board, player)
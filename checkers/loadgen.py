@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from .core import BOARD_SIZE, HUMAN, Board, get_valid_moves
+from .engine import PRESETS
+
+
+async def _request(reader, writer, request):
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def play_games(host, port, games, engine, board_size, time_limit_ms, seed, stats, max_plies=200):
+    """ Play games one after another over one connection, moving at random, and record every move's latency.
+
+    Games still going after max_plies are given up, as the arena calls them a draw.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            response = await _request(reader, writer, {'op': 'new', 'engine': engine, 'board_size': board_size})
+            game_id, state = response['game'], response['state']
+            while state['winner'] is None and state['plies'] < max_plies:
+                board = Board(state['computer'], state['human'], size=state['board_size'])
+                move = rng.choice(get_valid_moves(board, HUMAN))
+                start = time.perf_counter()
+                response = await _request(reader, writer, {'op': 'move', 'game': game_id, 'move': list(move),
+                                                           'time_limit_ms': time_limit_ms})
+                latency = time.perf_counter() - start
+                if response.get('busy'):
+                    stats['busy'] += 1
+                    # back off for about a search's time before trying the same move again
+                    await asyncio.sleep(rng.uniform(0.5, 1.5) * time_limit_ms / 1000)
+                    continue
+                if 'error' in response:
+                    stats['errors'] += 1
+                    break
+                stats['latencies'].append(latency)
+                state = response['state']
+            await _request(reader, writer, {'op': 'close', 'game': game_id})
+            stats['games'] += 1
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else float('nan')
+
+
+async def run_load(host='127.0.0.1', port=8765, clients=16, games=4, engine='alphabeta-complex',
+                   board_size=BOARD_SIZE, time_limit_ms=200, seed=0):
+    """ Play clients x games games against a running server at once.
+
+    :return: Report with moves per second and latency percentiles, in milliseconds
+    """
+    stats = {'latencies': [], 'busy': 0, 'errors': 0, 'games': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games(host, port, games, engine, board_size, time_limit_ms, seed + client, stats)
+                           for client in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies = stats['latencies']
+    return {
+        'clients': clients,
+        'games': stats['games'],
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies, default=float('nan')) * 1000,
+        'busy': stats['busy'],
+        'errors': stats['errors'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load a running checkers.server with concurrent random players.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=16, help='connections playing at the same time')
+    parser.add_argument('--games', type=int, default=4, help='games per connection')
+    parser.add_argument('--engine', choices=PRESETS, default='alphabeta-complex')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--time-limit-ms', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.host, args.port, args.clients, args.games, args.engine, args.board_size,
+                                  args.time_limit_ms, args.seed))
+    print(json.dumps(report, indent=1))
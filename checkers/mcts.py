@@ -0,0 +1,152 @@
+import math
+import random
+import time
+from math import inf
+
+from .core import COMPUTER, is_terminal_state, get_winner, get_valid_moves, move_piece, apply_move
+
+# how playouts choose their moves: 'random' among all moves, 'heuristic' mostly among the moves advancing towards the
+# mover's goal row, which ends playouts sooner and closer to how the game is played
+PLAYOUT_POLICIES = ('random', 'heuristic')
+# chance that a heuristic playout makes an advancing move when it has one
+ADVANCING_MOVE_PROBABILITY = 0.9
+# playouts still going after this many moves count as a draw
+MAX_PLAYOUT_PLIES = 200
+
+
+class Node:
+    """ Position in the search tree, reached by move from its parent's position. """
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'winner', 'visits', 'reward')
+
+    def __init__(self, move, player, parent, board):
+        self.move = move
+        self.player = player  # player to move
+        self.parent = parent
+        self.children = []
+        self.winner = get_winner(board, player)
+        # moves not expanded into children yet
+        self.untried = get_valid_moves(board, player) if self.winner is None else []
+        self.visits = 0
+        # sum of the playout results for the player who made move: 1 for a win, 0.5 for a draw, 0 for a loss
+        self.reward = 0.0
+
+    def most_visited_child(self):
+        return max(self.children, key=lambda child: child.visits, default=None)
+
+
+class MonteCarloTreeSearch:
+    """ UCT: grows a tree of positions one playout at a time, playing the moves that win the most playouts.
+
+    The tree is kept from one search to the next. A search of a position two or fewer moves below the previous root,
+    usually the position after the opponent's reply, goes on from that subtree.
+    """
+
+    def __init__(self, exploration=math.sqrt(2), playout='random', seed=0, max_playout_plies=MAX_PLAYOUT_PLIES):
+        """
+
+        :param exploration: UCT exploration constant; higher values try less visited moves more often
+        :param playout: One of PLAYOUT_POLICIES
+        :param seed: Seed of the random choices, so searches can be repeated
+        :param max_playout_plies: Moves after which a playout is given up as a draw
+        """
+        if playout not in PLAYOUT_POLICIES:
+            raise ValueError(f'unknown playout {playout!r}, expected one of {", ".join(PLAYOUT_POLICIES)}')
+        self.exploration = exploration
+        self.playout = playout
+        self.max_playout_plies = max_playout_plies
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_board = None
+
+    def clear(self):
+        self.root = self.root_board = None
+
+    def _reuse(self, board, player):
+        """ The node of the tree standing for board with player to move, detached from its parent; a new one if the
+        tree does not hold it.
+        """
+        if self.root is not None:
+            nodes = [(self.root, self.root_board)]
+            for _ in range(3):
+                for node, node_board in nodes:
+                    if node.player == player and node_board == board:
+                        node.parent = None
+                        return node
+                nodes = [(child, apply_move(node_board, child.move)) for node, node_board in nodes
+                         for child in node.children]
+        return Node(None, player, None, board)
+
+    def search(self, board, player, context, iterations=None, time_budget_ms=None):
+        """ Run playouts from board until iterations of them are done or time_budget_ms has passed.
+
+        :param context: SearchContext counting the tree nodes added and the playouts run
+        :return: (expected result for the computer between -1 and 1, best move or None, principal variation)
+        """
+        if iterations is None and time_budget_ms is None:
+            raise ValueError('a search needs iterations, time_budget_ms or both')
+        self.root = root = self._reuse(board, player)
+        self.root_board = board.copy()
+        deadline = inf if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        iteration = 0
+        while (iterations is None or iteration < iterations) and time.perf_counter() < deadline:
+            self.iterate(root, board.copy(), context)
+            iteration += 1
+
+        best = root.most_visited_child()
+        if best is None:
+            return (0.0 if root.winner is None else 1.0 if root.winner == COMPUTER else -1.0), None, ()
+        expected = best.reward / best.visits  # for player, who makes best.move
+        variation, node = [], root
+        while (node := node.most_visited_child()) is not None:
+            variation.append(node.move)
+        return (2 * expected - 1 if player == COMPUTER else 1 - 2 * expected), best.move, tuple(variation)
+
+    def iterate(self, root, board, context):
+        """ One playout: select a leaf of the tree by UCT, add one child to it, play on to the end, and update the
+        nodes on the way with the result. board is the position of root and is played on.
+        """
+        node = root
+        # selection
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            exploration = self.exploration
+            node = max(node.children, key=lambda child: child.reward / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            move_piece(board, node.move)
+        # expansion
+        if node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            move_piece(board, move)
+            child = Node(move, 1 - node.player, node, board)
+            node.children.append(child)
+            node = child
+            context.nodes[1] += 1
+        # simulation
+        winner = node.winner if node.winner is not None else self.play_out(board, node.player)
+        context.nodes[0] += 1
+        context.leaves += 1
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            mover = 1 - node.player
+            node.reward += 0.5 if winner is None else 1.0 if winner == mover else 0.0
+            node = node.parent
+
+    def play_out(self, board, player):
+        """ Play board on to the end with player to move; returns the winner, None for a draw. """
+        rng = self.rng
+        heuristic = self.playout == 'heuristic'
+        for _ in range(self.max_playout_plies):
+            if is_terminal_state(board):
+                return get_winner(board, player)
+            moves = get_valid_moves(board, player)
+            if not moves:
+                return 1 - player
+            if heuristic and rng.random() < ADVANCING_MOVE_PROBABILITY:
+                forward_masks = board.geometry.forward_masks[player]
+                advancing = [move for move in moves if forward_masks[move[0]] >> move[1] & 1]
+                if advancing:
+                    moves = advancing
+            move_piece(board, rng.choice(moves))
+            player = 1 - player
+        return None
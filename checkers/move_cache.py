@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+from .core import ZOBRIST_MAX_TO_MOVE, COMPUTER, HUMAN, get_valid_moves
+
+
+class MoveCache:
+    """ Move lists of the positions generated most recently, keyed by Zobrist key and player to move.
+
+    A position searched again, e.g. by the next iteration of iterative deepening, then takes its moves from the cache
+    instead of generating them. Most such positions are cut off by the transposition table or by their stored best
+    move before their moves are needed, so on small boards few lookups hit; engines use no cache unless given a
+    capacity. Once the cache holds capacity positions, the least recently used one is evicted. An entry keeps the
+    pieces it was generated for, so positions with colliding keys never share moves.
+    """
+
+    def __init__(self, capacity=1 << 12):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, board, player):
+        """ The list of get_valid_moves(board, player), shared by every caller, who must not change it. """
+        key = board.key ^ ZOBRIST_MAX_TO_MOVE if player == COMPUTER else board.key
+        entries = self.entries
+        entry = entries.get(key)
+        pieces = board.pieces
+        if (entry is not None and entry[0] == pieces[COMPUTER] and entry[1] == pieces[HUMAN]
+                and entry[2] is board.geometry):
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry[3]
+        self.misses += 1
+        moves = get_valid_moves(board, player)
+        entries[key] = pieces[COMPUTER], pieces[HUMAN], board.geometry, moves
+        # replacing an entry under the same key keeps its place in the order, which must be the newest
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return moves
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
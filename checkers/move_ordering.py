@@ -0,0 +1,55 @@
+from .core import COMPUTER
+
+
+class MoveOrdering:
+    """ Orders moves so that the ones most likely to cause a cutoff are searched first.
+
+    Moves are ranked by, in this order: the principal variation move, moves advancing towards the goal row, killer
+    moves and history score. Each part can be switched off; moves that tie keep the order they were generated in.
+    Any object with the same order / record_cutoff methods can be used by the search instead.
+    """
+
+    def __init__(self, pv=True, forward=True, killers=True, history=True, no_of_killers=2):
+        self.use_pv, self.use_forward, self.use_killers, self.use_history = pv, forward, killers, history
+        self.no_of_killers = no_of_killers
+        self.clear()
+
+    def clear(self):
+        # killer moves are kept per remaining depth, which within a single search identifies the ply
+        self.killers = {}
+        self.history = ({}, {})
+
+    def order(self, moves, player, depth, pv_move=None):
+        """
+
+        :param moves: Moves as generated by get_valid_moves
+        :param player: Player making the moves
+        :param depth: Remaining depth of the node the moves are searched at
+        :param pv_move: Best move known for this node, e.g. from the transposition table
+        :return: New list with the moves in search order
+        """
+        pv_move = pv_move if self.use_pv else None
+        # on boards of size 3 and up, a move one row forward changes the square by at least size - 1 >= 2 and a move
+        # along the row by exactly 1, so the sign of the difference tells the direction on any board
+        direction = 1 if player == COMPUTER else -1
+        killers = self.killers.get(depth, ()) if self.use_killers else ()
+        history = self.history[player] if self.use_history else {}
+        use_forward = self.use_forward
+
+        def rank(move):
+            return (move == pv_move,
+                    use_forward and (move[1] - move[0]) * direction > 1,
+                    move in killers,
+                    history.get(move, 0))
+
+        return sorted(moves, key=rank, reverse=True)
+
+    def record_cutoff(self, move, player, depth):
+        """ Remember move, which caused a cutoff at a node with depth left to search. """
+        killers = self.killers.setdefault(depth, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.no_of_killers:]
+        # deeper cutoffs save more work, so they weigh more
+        self.history[player][move] = self.history[player].get(move, 0) + depth * depth
+
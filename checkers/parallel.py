@@ -0,0 +1,174 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import inf
+from multiprocessing import Array
+
+from .core import COMPUTER, Board, is_terminal_state, get_valid_moves, move_piece, mirror_move, tt_key
+from .engine import Engine, SearchResult
+from .search import STRATEGIES, minimax, order_moves, principal_variation
+from .transposition import probe_cutoff
+
+# values of the root moves searched so far, NaN while a move is still being searched; set in every worker
+_root_values = None
+
+
+def _init_worker(root_values):
+    global _root_values
+    _root_values = root_values
+
+
+# engines of a worker process, by board size and options; they keep their tables from one task to the next, and keys
+# of boards of different sizes must not meet in one table
+_engines = {}
+
+
+def worker_engine(options, size):
+    """ The engine built from options that searches boards of size in this process, built on first use. """
+    key = size, tuple(sorted(options.items()))
+    if key not in _engines:
+        _engines[key] = Engine(**options)
+    return _engines[key]
+
+
+def _search_root_move(options, pieces, size, move, index, depth, is_max_player):
+    """ Search the position after the root move at index, in a worker process; returns its value and statistics.
+
+    Alpha-beta engines get the best value among the root moves before index that are already finished as their
+    bound. Moves after index are left out, so a move only beats an earlier one with a strictly better value, which is
+    how the sequential search breaks ties.
+    """
+    engine = worker_engine(options, size)
+    board = Board(*pieces, size=size)
+    move_piece(board, move)
+    context = engine.new_context()
+    if engine.algorithm == 'minimax':  # plain minimax has no bounds to share
+        return minimax(board, depth - 1, not is_max_player, context)[0], context.as_dict()
+
+    with _root_values.get_lock():
+        finished = [value for value in _root_values[:index] if not math.isnan(value)]
+    strategy = STRATEGIES[engine.strategy]
+    if is_max_player:
+        value, _ = strategy(board, depth - 1, False, max(finished, default=-inf), +inf, context)
+    else:
+        value, _ = strategy(board, depth - 1, True, -inf, min(finished, default=+inf), context)
+    return value, context.as_dict()
+
+
+def parallel_search(engine, board, player, depth=None, workers=None):
+    """ Search the root moves in parallel, one task per move, with the young brothers wait scheme.
+
+    The first root move is searched alone; the remaining ones are then handed to the worker processes, each starting
+    from the best value finished before it. Every worker builds its own engine from engine.options. Returns the same
+    move as engine.search at equal depth.
+
+    :param engine: Engine searching to a fixed depth with minimax or alpha-beta; greedy engines search on their own,
+     mcts engines with parallel_mcts
+    :param board:
+    :param player: Player to move
+    :param depth: Depth to search to instead of the engine's, the number of playouts of each worker for mcts
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :return: SearchResult, its context with the statistics of all workers added up
+    """
+    if engine.algorithm == 'greedy':
+        return engine.search(board, player)
+    if engine.algorithm == 'mcts':
+        return parallel_mcts(engine, board, player, workers, playouts=depth)
+    depth = engine.depth if depth is None else depth
+    context = engine.new_context()
+    result = engine.tablebase_move(board, player, context) or engine.book_move(board, player, context)
+    if result is not None:
+        return result
+    is_max_player = player == COMPUTER
+    if depth == 0 or is_terminal_state(board):
+        return SearchResult(None, None, depth, context)
+
+    moves = get_valid_moves(board, player)
+    if engine.algorithm == 'alphabeta':
+        key, mirrored = tt_key(board, player)
+        entry = engine.transposition_table.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = mirror_move(board, entry.move) if mirrored else entry.move
+            if probe_cutoff(entry, depth, -inf, +inf):
+                return SearchResult(tt_move, entry.value, depth, context,
+                                    principal_variation(board, player, tt_move, depth, context))
+        moves = order_moves(moves, player, depth, tt_move, context)
+    if not moves:
+        return SearchResult(None, None, depth, context)
+
+    root_values = Array('d', [math.nan] * len(moves))
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_worker, initargs=(root_values,)) as pool:
+        def submit(index):
+            return pool.submit(_search_root_move, engine.options, tuple(board.pieces), board.size, moves[index], index,
+                               depth, is_max_player)
+
+        def finish(index, future):
+            value, stats = future.result()
+            with root_values.get_lock():
+                root_values[index] = value
+            context.merge(stats)
+
+        # the eldest brother is searched first so that every other move starts with its value as a bound
+        finish(0, submit(0))
+        futures = {submit(index): index for index in range(1, len(moves))}
+        for future in as_completed(futures):
+            finish(futures[future], future)
+
+    best_move, best_value = None, -inf if is_max_player else +inf
+    for move, value in zip(moves, root_values):
+        if value > best_value if is_max_player else value < best_value:
+            best_move, best_value = move, value
+    # the workers' tables, which hold the rest of the line, are not shared with this process
+    return SearchResult(best_move, best_value, depth, context, () if best_move is None else (best_move,))
+
+
+def _mcts_root(options, pieces, size, player, iterations, time_budget_ms, seed):
+    """ Run a Monte Carlo tree search of its own in a worker process; returns the visits and reward of every root
+    move and the statistics of the search.
+    """
+    engine = worker_engine(dict(options, seed=seed), size)
+    context = engine.new_context()
+    engine.tree.search(Board(*pieces, size=size), player, context, iterations, time_budget_ms)
+    root_moves = {child.move: (child.visits, child.reward) for child in engine.tree.root.children}
+    return root_moves, context.as_dict()
+
+
+def parallel_mcts(engine, board, player, workers=None, time_budget_ms=None, playouts=None):
+    """ Root parallel Monte Carlo tree search: every worker process grows a tree of its own from board, with its own
+    seed, and the move visited most in all of them together is played.
+
+    Every worker runs the engine's number of playouts, or as many as fit in time_budget_ms, so more workers run more
+    playouts in the same time.
+
+    :param engine: Engine with the mcts algorithm
+    :param board:
+    :param player: Player to move
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param time_budget_ms: Time each worker searches for instead of running the engine's number of playouts
+    :param playouts: Number of playouts each worker runs instead of the engine's
+    :return: SearchResult, its context with the statistics of all workers added up
+    """
+    context = engine.new_context()
+    result = engine.tablebase_move(board, player, context) or engine.book_move(board, player, context)
+    if result is not None:
+        return result
+    workers = workers or os.cpu_count()
+    iterations = None if time_budget_ms is not None else engine.depth if playouts is None else playouts
+    root_moves = {}
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_mcts_root, engine.options, tuple(board.pieces), board.size, player, iterations,
+                               time_budget_ms, engine.options['seed'] + worker) for worker in range(workers)]
+        for future in futures:
+            moves, stats = future.result()
+            for move, (visits, reward) in moves.items():
+                total_visits, total_reward = root_moves.get(move, (0, 0.0))
+                root_moves[move] = total_visits + visits, total_reward + reward
+            context.merge(stats)
+    if not root_moves:
+        return SearchResult(None, None, context.leaves, context)
+    best_move = max(root_moves, key=lambda move: root_moves[move][0])
+    visits, reward = root_moves[best_move]
+    expected = reward / visits  # for player
+    return SearchResult(best_move, 2 * expected - 1 if player == COMPUTER else 1 - 2 * expected, context.leaves,
+                        context, (best_move,))
@@ -0,0 +1,94 @@
+import argparse
+
+from .core import (BOARD_SIZE, COMPUTER, HUMAN, initial_board, print_board, is_terminal_state, get_winner,
+                   get_valid_moves, move_piece, parse_move)
+from .engine import PRESETS, Engine
+from .ponder import Ponderer
+from .records import GameWriter
+
+
+def read_move(board):
+    """ Ask the human for a move until they enter a valid one. """
+    valid_moves = get_valid_moves(board, HUMAN)
+    while True:
+        user_piece_to_move = input('Enter coordinates of the piece you want to move, separated by space: ')
+        where_to_move = input('Enter coordinates of the cell you want to place the piece on, separated by space: ')
+        try:
+            move = parse_move(tuple(map(int, user_piece_to_move.split())), tuple(map(int, where_to_move.split())),
+                              board.size)
+        except ValueError:
+            move = None
+        if move in valid_moves:
+            return move
+        print("Try again :)")
+
+
+def play_game(engine, board_size=BOARD_SIZE, record_path=None, ponder=False):
+    """ Play against engine on the terminal; the human moves first.
+
+    :param record_path: Game file the game is appended to once it is over, see checkers.records
+    :param ponder: Search the computer's replies while the human thinks, see Ponderer
+    """
+    board = initial_board(board_size)
+    coordinates = board.geometry.coordinates
+    moves = []
+    ponderer = Ponderer(engine) if ponder else None
+    expected_move = None
+    print("Game on")
+    print_board(board)
+    while not is_terminal_state(board):
+        print("Your turn: ")
+        if ponderer is not None:
+            ponderer.start(board, HUMAN, expected_move)
+        moves.append(read_move(board))
+        move_piece(board, moves[-1])
+        if is_terminal_state(board):
+            break
+        result = engine.search(board, COMPUTER) if ponderer is None else ponderer.reply(board)
+        expected_move = result.pv[1] if len(result.pv) > 1 else None
+        if result.move is None:
+            print("The computer has no move left")
+            break
+        print(f'Computer moved from {coordinates[result.move[0]]} to {coordinates[result.move[1]]}')
+        moves.append(result.move)
+        move_piece(board, result.move)
+        print_board(board)
+        print(f'Searched to depth {result.depth}, value={result.score}')
+        print(f'Number of prunes={result.context.prunes}, transposition table hits={result.context.tt_hits}, '
+              f'nodes={result.context.no_of_nodes}')
+    if ponderer is not None:
+        ponderer.stop()
+    print_board(board)
+    print("Game over")
+    if record_path is not None:
+        writer = GameWriter(record_path, board_size)
+        writer.append(moves, get_winner(board, HUMAN if len(moves) % 2 == 0 else COMPUTER), first_player=HUMAN)
+        writer.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play against the computer on the terminal.')
+    parser.add_argument('--engine', choices=PRESETS, default='alphabeta-complex')
+    parser.add_argument('--depth', type=int, help='depth to search every move to, instead of for --time-budget-ms')
+    parser.add_argument('--time-budget-ms', type=int,
+                        help='time per alpha-beta move, 1000 unless --depth is given, 0 to search to a fixed depth')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--tablebase', help='tablebase file to play solved positions perfectly from')
+    parser.add_argument('--cache', help='search cache file to reuse earlier searches from, see checkers.warmup')
+    parser.add_argument('--book', help='opening book file to play the opening from, see checkers.book')
+    parser.add_argument('--weights', help='weight file of the weighted evaluation, see checkers.tuning')
+    parser.add_argument('--record', help='game file to append the game to, see checkers.records')
+    parser.add_argument('--ponder', action='store_true', help='search replies while you think, alphabeta engines only')
+    args = parser.parse_args()
+    if args.depth is not None and args.time_budget_ms:
+        parser.error('--depth and --time-budget-ms both limit the search, give one of them')
+    time_budget_ms = 1000 if args.depth is None and args.time_budget_ms is None else args.time_budget_ms
+
+    options = dict(PRESETS[args.engine], tablebase_path=args.tablebase, cache_path=args.cache, book_path=args.book)
+    if args.weights is not None:
+        options.update(evaluation='weighted', weights_path=args.weights)
+    if args.depth is not None:
+        options['depth'] = args.depth
+    if time_budget_ms:
+        options['time_budget_ms'] = time_budget_ms
+    play_game(Engine(**options), args.board_size, args.record, args.ponder)
@@ -0,0 +1,108 @@
+import threading
+import traceback
+
+from .core import COMPUTER, HUMAN, apply_move, get_valid_moves, move_to_front, get_winner
+from .search import SearchTimeout
+
+
+class Ponderer:
+    """ Searches on the human's time: while they think about their move, the engine's replies to their likeliest
+    moves are searched in a background thread.
+
+    The background searches use the engine's own tables, so a reply whose search was completed is returned the moment
+    its position comes up, and any other position is searched from the transposition table and move ordering history
+    they left behind. The background thread never runs at the same time as a search of reply, which stops it first.
+    """
+
+    def __init__(self, engine):
+        """
+
+        :param engine: Alpha-beta Engine making the computer's moves; a search running in the background has to be
+         stoppable, which only alpha-beta searches are
+        """
+        if engine.algorithm != 'alphabeta':
+            raise ValueError(f'{engine.algorithm} engines can not ponder, only alphabeta ones')
+        self.engine = engine
+        self._thread = None
+        # context of the background search running, and (computer pieces, human pieces) of the position it searches
+        self._context = self._position = None
+        self._stopped = threading.Event()
+        # (computer pieces, human pieces) of a position after a human move -> completed SearchResult of its search
+        self.replies = {}
+        self.hits = self.misses = 0
+
+    def likely_moves(self, board, player, expected_move=None):
+        """ player's moves on board, the likeliest first: expected_move, then in the order of the engine's move
+        ordering, which ranks the moves that caused cutoffs in its searches first.
+        """
+        moves = get_valid_moves(board, player)
+        if self.engine.move_ordering is not None:
+            # the engine's last search met these moves one ply below its root
+            return self.engine.move_ordering.order(moves, player, self.engine.depth - 1, expected_move)
+        return move_to_front(moves, expected_move)
+
+    def start(self, board, player=HUMAN, expected_move=None):
+        """ Start searching the replies to player's moves on board in the background; board is left as it was.
+
+        :param expected_move: Move the engine's last search expects player to make, the second move of its
+         principal variation; its reply is searched first
+        """
+        self.stop()
+        self.replies = {}
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._ponder, args=(board.copy(), player, expected_move), daemon=True)
+        self._thread.start()
+
+    def _ponder(self, board, player, expected_move):
+        for move in self.likely_moves(board, player, expected_move):
+            position = apply_move(board, move)
+            if get_winner(position, 1 - player) is not None:
+                continue
+            self._context, self._position = self.engine.new_context(), (position.pieces[COMPUTER],
+                                                                         position.pieces[HUMAN])
+            context = self._context
+            # stop may have come before the context it stops was set
+            if self._stopped.is_set():
+                return
+            try:
+                result = self.engine.search(position, 1 - player, context=context)
+            except SearchTimeout:
+                return
+            except Exception:
+                # the human's move is then searched in the foreground, as if it was never pondered
+                traceback.print_exc()
+                return
+            # a stopped iterative deepening returns the iterations it completed, which is not the search asked for
+            if context.stopped:
+                return
+            self.replies[position.pieces[COMPUTER], position.pieces[HUMAN]] = result
+
+    def stop(self, keep=None):
+        """ Stop the background search, if any, and wait for its thread to finish.
+
+        :param keep: (computer pieces, human pieces) of a position whose search, if it is the one running, is finished
+         rather than stopped; no other one is started
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        # read after the event is set: a search started later sees the event and does not run
+        if self._context is not None and self._position != keep:
+            self._context.stop()
+        self._thread.join()
+        self._thread = self._context = self._position = None
+
+    def reply(self, board, player=COMPUTER):
+        """ Stop pondering and choose player's move on board, the position after the human's move.
+
+        :return: SearchResult, the pondered one if the search of board was completed in the background or is running
+         there; then it is finished rather than started over
+        """
+        position = board.pieces[COMPUTER], board.pieces[HUMAN]
+        self.stop(keep=position)
+        result = self.replies.get(position)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        return self.engine.search(board, player)
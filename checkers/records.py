@@ -0,0 +1,262 @@
+import argparse
+import mmap
+import os
+import re
+import struct
+from collections import namedtuple
+
+from .core import COMPUTER, HUMAN, EMPTY, Board, initial_board, get_valid_moves, move_piece
+
+# a record file is a header, then records appended one after the other: positions in a position file, games in a game
+# file; both are read through a memory map, records are decoded only when they are visited
+_POSITION_MAGIC = b'CKP1'
+_GAME_MAGIC = b'CKG1'
+# magic, board size
+_HEADER = struct.Struct('<4sB3x')
+# player to move first, winner (EMPTY for a draw), number of moves; the moves follow, one byte each
+_GAME = struct.Struct('<BBH')
+
+# a position's text form lists the rows from row 0, separated by '/'; a run of empty squares is written as its length,
+# a piece as the letter of its player; the letter of the player to move follows after a space, e.g. 'cccc/4/4/hhhh h'
+FEN_LETTERS = {COMPUTER: 'c', HUMAN: 'h'}
+
+# first_player: player who made the first move from the initial board; winner: COMPUTER, HUMAN or EMPTY for a draw;
+# moves: bytes holding every move as its index among get_valid_moves of the position it was made in
+Game = namedtuple('Game', 'first_player winner moves')
+
+
+def to_fen(board, player):
+    """ Text form of board with player to move. """
+    rows = []
+    for i in range(board.size):
+        row, empty = '', 0
+        for j in range(board.size):
+            piece = board[i, j]
+            if piece == EMPTY:
+                empty += 1
+                continue
+            if empty:
+                row += str(empty)
+                empty = 0
+            row += FEN_LETTERS[piece]
+        rows.append(row + (str(empty) if empty else ''))
+    return f'{"/".join(rows)} {FEN_LETTERS[player]}'
+
+
+def from_fen(text):
+    """ (board, player to move) of a text form written by to_fen; its number of rows is the size of the board. """
+    players = {letter: player for player, letter in FEN_LETTERS.items()}
+    try:
+        rows, to_move = text.split()
+        player = players[to_move]
+    except (ValueError, KeyError):
+        raise ValueError(f'{text!r} is not a position: expected rows and the player to move') from None
+    rows = rows.split('/')
+    size = len(rows)
+    pieces = [0, 0]
+    for i, row in enumerate(rows):
+        j = 0
+        for character in re.findall(r'\d+|.', row):
+            if character.isdigit():
+                j += int(character)
+            elif character in players and j < size:
+                pieces[players[character]] |= 1 << (i * size + j)
+                j += 1
+            else:
+                raise ValueError(f'{text!r} is not a position: unexpected {character!r} in row {i}')
+        if j != size:
+            raise ValueError(f'{text!r} is not a position: row {i} has {j} squares, not {size}')
+    return Board(*pieces, size=size), player
+
+
+def mask_bytes(size):
+    """ Bytes holding one player's pieces on a size x size board. """
+    return (size * size + 7) // 8
+
+
+def pack_position(board, player):
+    """ Binary form of board with player to move: the player, then the computer's and the human's pieces. """
+    width = mask_bytes(board.size)
+    return (bytes((player,)) + board.pieces[COMPUTER].to_bytes(width, 'little')
+            + board.pieces[HUMAN].to_bytes(width, 'little'))
+
+
+def unpack_position(data, size):
+    """ (board, player to move) of the binary form written by pack_position; data may be any bytes-like object. """
+    width = mask_bytes(size)
+    return (Board(int.from_bytes(data[1:1 + width], 'little'), int.from_bytes(data[1 + width:1 + 2 * width], 'little'),
+                  size=size), data[0])
+
+
+def pack_moves(moves, first_player, size):
+    """ Binary form of a game played from the initial board, one byte per move.
+
+    :raise ValueError: if a move can not be made
+    """
+    board, player, packed = initial_board(size), first_player, bytearray()
+    for move in moves:
+        valid_moves = get_valid_moves(board, player)
+        if move not in valid_moves:
+            raise ValueError(f'move {move} can not be made after {len(packed)} moves')
+        packed.append(valid_moves.index(move))
+        move_piece(board, move)
+        player = 1 - player
+    return bytes(packed)
+
+
+def replay(game, size):
+    """ Play a game through, yielding (board, player to move, move made) for every move; board is played on. """
+    board, player = initial_board(size), game.first_player
+    for index in game.moves:
+        move = get_valid_moves(board, player)[index]
+        yield board, player, move
+        move_piece(board, move)
+        player = 1 - player
+
+
+def _open_for_append(path, magic, size):
+    """ path opened for appending records, its header written if it is new and checked if it is not. """
+    file = open(path, 'a+b')
+    if file.tell() == 0:
+        file.write(_HEADER.pack(magic, size))
+        return file
+    file.seek(0)
+    header = file.read(_HEADER.size)
+    file.seek(0, os.SEEK_END)
+    if len(header) != _HEADER.size or _HEADER.unpack(header) != (magic, size):
+        file.close()
+        raise ValueError(f'{path} is not a record file of this kind for {size}x{size} boards')
+    return file
+
+
+class _RecordFile:
+    """ Memory map of a record file, with a zero-copy view of the records after its header. """
+
+    def __init__(self, path, magic):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size or self._mmap[:4] != magic:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a record file of this kind')
+        _, self.size = _HEADER.unpack_from(self._mmap)
+        self._records = memoryview(self._mmap)[_HEADER.size:]
+
+    def close(self):
+        self._records.release()
+        self._mmap.close()
+
+
+class PositionWriter:
+    """ Appends positions to a position file, creating it if needed. """
+
+    def __init__(self, path, size):
+        self.size = size
+        self._file = _open_for_append(path, _POSITION_MAGIC, size)
+
+    def append(self, board, player):
+        if board.size != self.size:
+            raise ValueError(f'a {board.size}x{board.size} board does not fit a file of {self.size}x{self.size} ones')
+        self._file.write(pack_position(board, player))
+
+    def close(self):
+        self._file.close()
+
+
+class PositionFile(_RecordFile):
+    """ Position file read through a memory map; positions are fixed-size records, so any of them is read directly. """
+
+    def __init__(self, path):
+        super().__init__(path, _POSITION_MAGIC)
+        self._record_size = 1 + 2 * mask_bytes(self.size)
+        # a record being appended while the file was mapped is left out
+        self._no_of_positions = len(self._records) // self._record_size
+
+    def __len__(self):
+        return self._no_of_positions
+
+    def __getitem__(self, index):
+        """ (board, player to move) of the position at index. """
+        if not -self._no_of_positions <= index < self._no_of_positions:
+            raise IndexError('position index out of range')
+        offset = index % self._no_of_positions * self._record_size
+        return unpack_position(self._records[offset:offset + self._record_size], self.size)
+
+    def __iter__(self):
+        return (self[index] for index in range(self._no_of_positions))
+
+    def scan(self):
+        """ Yield (computer pieces, human pieces, player to move) of every position without building its board, for
+        passes over the whole file that only look at a few of the positions closely.
+        """
+        records, record_size, width = self._records, self._record_size, mask_bytes(self.size)
+        from_bytes = int.from_bytes
+        for offset in range(0, self._no_of_positions * record_size, record_size):
+            yield (from_bytes(records[offset + 1:offset + 1 + width], 'little'),
+                   from_bytes(records[offset + 1 + width:offset + record_size], 'little'), records[offset])
+
+
+class GameWriter:
+    """ Appends games to a game file, creating it if needed. """
+
+    def __init__(self, path, size):
+        self.size = size
+        self._file = _open_for_append(path, _GAME_MAGIC, size)
+
+    def append(self, moves, winner, first_player=HUMAN):
+        """
+
+        :param moves: Moves of the game, made one after the other from the initial board
+        :param winner: COMPUTER, HUMAN or None for a draw
+        :param first_player: Player who made the first move
+        """
+        packed = pack_moves(moves, first_player, self.size)
+        self._file.write(_GAME.pack(first_player, EMPTY if winner is None else winner, len(packed)) + packed)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class GameFile(_RecordFile):
+    """ Game file read through a memory map as a stream of games. The moves of a game, a byte each, are copied out of
+    the map, so games stay valid after the file is closed, which a view into the map would keep from happening.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, _GAME_MAGIC)
+
+    def __iter__(self):
+        records, offset = self._records, 0
+        while offset + _GAME.size <= len(records):
+            first_player, winner, no_of_moves = _GAME.unpack_from(records, offset)
+            offset += _GAME.size
+            # a game being appended while the file was mapped is left out
+            if offset + no_of_moves > len(records):
+                return
+            yield Game(first_player, winner, bytes(records[offset:offset + no_of_moves]))
+            offset += no_of_moves
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Print the positions or games of a record file.')
+    parser.add_argument('path', help='position file or game file')
+    args = parser.parse_args()
+
+    with open(args.path, 'rb') as record_file:
+        file_magic = record_file.read(4)
+    if file_magic == _POSITION_MAGIC:
+        positions = PositionFile(args.path)
+        for position_board, position_player in positions:
+            print(to_fen(position_board, position_player))
+        print(f'{len(positions)} positions')
+    else:
+        games = GameFile(args.path)
+        coordinates = initial_board(games.size).geometry.coordinates
+        outcomes = {COMPUTER: 'computer', HUMAN: 'human', EMPTY: 'draw'}
+        no_of_games = 0
+        for game in games:
+            line = ' '.join(f'{i},{j}-{k},{l}' for _, _, move in replay(game, games.size)
+                            for (i, j), (k, l) in [(coordinates[move[0]], coordinates[move[1]])])
+            print(f'{outcomes[game.winner]} after {len(game.moves)} moves: {line}')
+            no_of_games += 1
+        print(f'{no_of_games} games')
@@ -0,0 +1,561 @@
+import time
+from math import inf, nextafter
+
+from .core import (HUMAN, COMPUTER, is_terminal_state, get_valid_moves, iter_valid_moves, is_valid_move, move_to_front,
+                   move_piece, undo_move, mirror_move, tt_key)
+from .transposition import bound_flag, probe_cutoff
+
+# with late move reductions, moves searched after this many at a node are searched one ply shallower first
+LATE_MOVE_INDEX = 3
+# shallowest depth at which late moves are reduced, so a reduced move is still searched at least one ply deep
+REDUCTION_MIN_DEPTH = 3
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def evaluate(board, player, context):
+    """ Value of a leaf: exact from the tablebase when it solves the position, from the evaluation otherwise. """
+    context.leaves += 1
+    if context.tablebase is not None:
+        score = context.tablebase.score(board, player)
+        if score is not None:
+            return score
+    if not context.time_evaluations:
+        return context.evaluation(board, player)
+    start = time.perf_counter()
+    value = context.evaluation(board, player)
+    context.evaluation_seconds += time.perf_counter() - start
+    return value
+
+
+def is_critical(board, move):
+    """ Whether move enters a goal row, either to fill it or to block the opponent from filling it. """
+    goal_rows = board.geometry.goal_masks[COMPUTER] | board.geometry.goal_masks[HUMAN]
+    return goal_rows >> move[1] & 1 and not goal_rows >> move[0] & 1
+
+
+def quiescence(board, player, depth, alpha, beta, context):
+    """ Value of a position at or past the nominal depth of an alpha-beta search, player to move.
+
+    Without extensions left - context.quiescence_depth plies past the nominal depth - this is the evaluation of the
+    position. Otherwise player's critical moves are searched as well, so a goal row about to be filled or blocked
+    just beyond the horizon is seen. Quiet moves are not searched: player may always make one instead, which the
+    evaluation stands for.
+
+    :param depth: 0 at the nominal depth, one less for every ply of extension
+    :return: value of the position
+    """
+    value = evaluate(board, player, context)
+    if depth <= -context.quiescence_depth or is_terminal_state(board):
+        return value
+    if player == COMPUTER:
+        if value >= beta:
+            return value
+        alpha = max(alpha, value)
+    else:
+        if value <= alpha:
+            return value
+        beta = min(beta, value)
+
+    for move in iter_valid_moves(board, player):
+        if not is_critical(board, move):
+            continue
+        context.nodes[depth - 1] += 1
+        move_piece(board, move)
+        board_state_value = quiescence(board, 1 - player, depth - 1, alpha, beta, context)
+        undo_move(board, move)
+        if player == COMPUTER:
+            if board_state_value > value:
+                value = alpha = board_state_value
+            if value >= beta:
+                context.prunes += 1
+                return value
+        else:
+            if board_state_value < value:
+                value = beta = board_state_value
+            if value <= alpha:
+                context.prunes += 1
+                return value
+    return value
+
+
+def minimax(board, depth, is_max_player, context):
+    """
+
+    :param board:
+    :param depth:
+    :param is_max_player:
+    :param context: SearchContext with the evaluation to use, collecting the statistics of this search
+    :return: (value, best move or None if there is no move to make)
+    """
+    if is_max_player:  # the computer is currently taking the turn
+        return minimax_max(board, depth, context)
+    return minimax_min(board, depth, context)
+
+
+def minimax_max(board, depth, context):
+    """ Search in place: every move is made on board and undone after its subtree is searched.
+
+    :param board:
+    :param depth:
+    :param context: SearchContext of the search
+    :return: Returns maximum heuristic value from direct descendants and the move leading to it
+    """
+    context.nodes[depth] += 1
+    if depth == 0 or is_terminal_state(board):
+        return evaluate(board, COMPUTER, context), None
+
+    max_move = None
+    max_value = -inf
+    for move in get_valid_moves(board, COMPUTER):
+        move_piece(board, move)
+        board_state_value, _ = minimax_min(board, depth - 1, context)
+        undo_move(board, move)
+        if board_state_value > max_value:
+            max_value = board_state_value
+            max_move = move
+
+    if context.trace is not None:
+        context.trace('max', board, depth, max_value, max_move)
+    return max_value, max_move
+
+
+def minimax_min(board, depth, context):
+    """ Search in place: every move is made on board and undone after its subtree is searched.
+
+    :param board:
+    :param depth:
+    :param context: SearchContext of the search
+    :return: Returns minimum heuristic value from direct descendants and the move leading to it
+    """
+    context.nodes[depth] += 1
+    if depth == 0 or is_terminal_state(board):
+        return evaluate(board, HUMAN, context), None
+
+    min_move = None
+    min_value = +inf
+    for move in get_valid_moves(board, HUMAN):
+        move_piece(board, move)
+        board_state_value, _ = minimax_max(board, depth - 1, context)
+        undo_move(board, move)
+        if min_value > board_state_value:
+            min_value = board_state_value
+            min_move = move
+
+    if context.trace is not None:
+        context.trace('min', board, depth, min_value, min_move)
+    return min_value, min_move
+
+
+def alpha_beta(board, depth, is_max_player, alpha, beta, context):
+    """
+
+    :param board:
+    :param depth:
+    :param is_max_player:
+    :param alpha:
+    :param beta:
+    :param context: SearchContext with the evaluation, transposition table and move ordering to use
+    :return: (value, best move or None if there is no move to make)
+    """
+    if is_max_player:  # the computer is currently taking the turn
+        return calculate_max(board, depth, alpha, beta, context)
+    return calculate_min(board, depth, alpha, beta, context)
+
+
+def order_moves(moves, player, depth, tt_move, context):
+    if context.move_ordering is not None:
+        return context.move_ordering.order(moves, player, depth, tt_move)
+    # the best move stored by a shallower search of this position (e.g. the previous iteration) goes first
+    return move_to_front(moves, tt_move)
+
+
+def search_moves(board, player, depth, tt_move, context):
+    """ Moves of player to search at an alpha-beta node, in search order, generated in stages.
+
+    The stored best move comes first and is made before any other move is generated, so a cutoff by it - the most
+    common one - costs no move generation. Move ordering then sorts all moves, taking them from context.move_cache when
+    there is one; without move ordering the others are generated lazily, one at a time.
+    """
+    move_ordering = context.move_ordering
+    if move_ordering is None:
+        yield from iter_valid_moves(board, player, tt_move)
+        return
+    if tt_move is not None and getattr(move_ordering, 'use_pv', True) and is_valid_move(board, player, tt_move):
+        yield tt_move
+    else:
+        tt_move = None
+    moves = get_valid_moves(board, player) if context.move_cache is None else context.move_cache.get(board, player)
+    for move in move_ordering.order(moves, player, depth, tt_move):
+        if move != tt_move:
+            yield move
+
+
+def _first_reduced_index(depth, context):
+    """ Index of the first move a node searched to depth may search with a late move reduction, inf if it reduces none;
+    a move from there on is reduced unless it is critical.
+    """
+    if context.late_move_reductions and depth >= REDUCTION_MIN_DEPTH:
+        return LATE_MOVE_INDEX
+    return inf
+
+
+def _late_move_search(depth, player, alpha, beta, search):
+    """ Value of a late move made by player at a node searched to depth, searched one ply shallower first; a reduced
+    search that finds the move better than the best so far is checked at full depth.
+
+    :param alpha: Bound the computer's move has to beat
+    :param beta: Bound the human's move has to beat
+    :param search: Function searching the position after the move to the depth it is given, returning its value
+    """
+    value = search(depth - 2)
+    if value <= alpha if player == COMPUTER else value >= beta:
+        return value
+    return search(depth - 1)
+
+
+def calculate_max(board, depth, alpha, beta, context):
+    """ Search in place: every move is made on board and undone after its subtree is searched.
+
+    :param board:
+    :param depth:
+    :param alpha:
+    :param beta:
+    :param context: SearchContext of the search; raises SearchTimeout once its deadline has passed
+    :return: Returns maximum heuristic value from direct descendants and the move leading to it
+    """
+    context.nodes[depth] += 1
+    if depth == 0 or is_terminal_state(board):
+        return quiescence(board, COMPUTER, 0, alpha, beta, context), None
+
+    transposition_table = context.transposition_table
+    key, mirrored = tt_key(board, COMPUTER)
+    entry = transposition_table.probe(key)
+    context.tt_probes += 1
+    tt_move = None
+    if entry is not None:
+        context.tt_hits += 1
+        tt_move = mirror_move(board, entry.move) if mirrored else entry.move
+        if probe_cutoff(entry, depth, alpha, beta):
+            return entry.value, tt_move
+    alpha_orig, beta_orig = alpha, beta
+    if context.deadline != inf and time.perf_counter() > context.deadline:
+        raise SearchTimeout
+
+    max_move = None
+    max_value = -inf
+    moves = search_moves(board, COMPUTER, depth, tt_move, context)
+    reduced_from = _first_reduced_index(depth, context)
+    for index, move in enumerate(moves):
+        move_piece(board, move)
+        if index >= reduced_from and not is_critical(board, move):
+            board_state_value = _late_move_search(
+                depth, COMPUTER, alpha, beta,
+                lambda child_depth: calculate_min(board, child_depth, alpha, beta, context)[0])
+        else:
+            board_state_value, _ = calculate_min(board, depth - 1, alpha, beta, context)
+        undo_move(board, move)
+
+        if board_state_value > max_value:
+            max_value = board_state_value
+            max_move = move
+            alpha = max_value
+
+        if max_value >= beta:
+            context.prunes += 1
+            context.cutoff_positions[index] += 1
+            if context.move_ordering is not None:
+                context.move_ordering.record_cutoff(move, COMPUTER, depth)
+            if context.trace is not None:
+                context.trace('prune', board, depth, max_value, max_move)
+            transposition_table.store(key, depth, max_value, bound_flag(max_value, alpha_orig, beta_orig),
+                                      mirror_move(board, max_move) if mirrored else max_move)
+            return max_value, max_move
+
+    if context.trace is not None:
+        context.trace('max', board, depth, max_value, max_move)
+    transposition_table.store(key, depth, max_value, bound_flag(max_value, alpha_orig, beta_orig),
+                              mirror_move(board, max_move) if mirrored else max_move)
+    return max_value, max_move
+
+
+def calculate_min(board, depth, alpha, beta, context):
+    """ Search in place: every move is made on board and undone after its subtree is searched.
+
+    :param board:
+    :param depth:
+    :param alpha:
+    :param beta:
+    :param context: SearchContext of the search; raises SearchTimeout once its deadline has passed
+    :return: Returns minimum heuristic value from direct descendants and the move leading to it
+    """
+    context.nodes[depth] += 1
+    if depth == 0 or is_terminal_state(board):
+        return quiescence(board, HUMAN, 0, alpha, beta, context), None
+
+    transposition_table = context.transposition_table
+    key, mirrored = tt_key(board, HUMAN)
+    entry = transposition_table.probe(key)
+    context.tt_probes += 1
+    tt_move = None
+    if entry is not None:
+        context.tt_hits += 1
+        tt_move = mirror_move(board, entry.move) if mirrored else entry.move
+        if probe_cutoff(entry, depth, alpha, beta):
+            return entry.value, tt_move
+    alpha_orig, beta_orig = alpha, beta
+    if context.deadline != inf and time.perf_counter() > context.deadline:
+        raise SearchTimeout
+
+    min_move = None
+    min_value = +inf
+    moves = search_moves(board, HUMAN, depth, tt_move, context)
+    reduced_from = _first_reduced_index(depth, context)
+    for index, move in enumerate(moves):
+        move_piece(board, move)
+        if index >= reduced_from and not is_critical(board, move):
+            board_state_value = _late_move_search(
+                depth, HUMAN, alpha, beta,
+                lambda child_depth: calculate_max(board, child_depth, alpha, beta, context)[0])
+        else:
+            board_state_value, _ = calculate_max(board, depth - 1, alpha, beta, context)
+        undo_move(board, move)
+
+        if min_value > board_state_value:
+            min_value = board_state_value
+            min_move = move
+            beta = min_value
+
+        if min_value <= alpha:
+            context.prunes += 1
+            context.cutoff_positions[index] += 1
+            if context.move_ordering is not None:
+                context.move_ordering.record_cutoff(move, HUMAN, depth)
+            if context.trace is not None:
+                context.trace('prune', board, depth, min_value, min_move)
+            transposition_table.store(key, depth, min_value, bound_flag(min_value, alpha_orig, beta_orig),
+                                      mirror_move(board, min_move) if mirrored else min_move)
+            return min_value, min_move
+
+    if context.trace is not None:
+        context.trace('min', board, depth, min_value, min_move)
+    transposition_table.store(key, depth, min_value, bound_flag(min_value, alpha_orig, beta_orig),
+                              mirror_move(board, min_move) if mirrored else min_move)
+    return min_value, min_move
+
+
+def fail_soft_search(board, depth, player, alpha, beta, null_window, context):
+    """ Alpha-beta search returning the best value found even when it lies outside (alpha, beta).
+
+    A value at or below alpha is an upper bound of the real value and one at or above beta a lower bound, each as
+    tight as the search could make it. With null_window, every move after the first is only tested against the best
+    value so far with a window of zero width, and searched again with the full window when it beats it (NegaScout
+    or principal variation search).
+
+    :param player: Player to move
+    :return: (value, best move or None if there is no move to make)
+    """
+    context.nodes[depth] += 1
+    if depth == 0 or is_terminal_state(board):
+        return quiescence(board, player, 0, alpha, beta, context), None
+
+    is_max_player = player == COMPUTER
+    transposition_table = context.transposition_table
+    key, mirrored = tt_key(board, player)
+    entry = transposition_table.probe(key)
+    context.tt_probes += 1
+    tt_move = None
+    if entry is not None:
+        context.tt_hits += 1
+        tt_move = mirror_move(board, entry.move) if mirrored else entry.move
+        if probe_cutoff(entry, depth, alpha, beta):
+            return entry.value, tt_move
+    alpha_orig, beta_orig = alpha, beta
+    if context.deadline != inf and time.perf_counter() > context.deadline:
+        raise SearchTimeout
+
+    best_move = None
+    best_value = -inf if is_max_player else +inf
+    moves = search_moves(board, player, depth, tt_move, context)
+    reduced_from = _first_reduced_index(depth, context)
+    for index, move in enumerate(moves):
+        move_piece(board, move)
+        if index == 0:
+            board_state_value, _ = fail_soft_search(board, depth - 1, 1 - player, alpha, beta, null_window, context)
+        else:
+            reduced = index >= reduced_from and not is_critical(board, move)
+            board_state_value = _search_later_move(board, reduced, depth, player, alpha, beta, null_window, context)
+        undo_move(board, move)
+
+        if board_state_value > best_value if is_max_player else board_state_value < best_value:
+            best_value = board_state_value
+            best_move = move
+            if is_max_player:
+                alpha = max(alpha, best_value)
+            else:
+                beta = min(beta, best_value)
+
+        if alpha >= beta:
+            context.prunes += 1
+            context.cutoff_positions[index] += 1
+            if context.move_ordering is not None:
+                context.move_ordering.record_cutoff(move, player, depth)
+            if context.trace is not None:
+                context.trace('prune', board, depth, best_value, best_move)
+            break
+    else:
+        if context.trace is not None:
+            context.trace('max' if is_max_player else 'min', board, depth, best_value, best_move)
+    transposition_table.store(key, depth, best_value, bound_flag(best_value, alpha_orig, beta_orig),
+                              mirror_move(board, best_move) if mirrored else best_move)
+    return best_value, best_move
+
+
+def _search_later_move(board, reduced, depth, player, alpha, beta, null_window, context):
+    """ Value for the fail-soft search of a move after the first one, already made on board by player.
+
+    :param reduced: Whether the move is searched with a late move reduction
+    """
+    is_max_player = player == COMPUTER
+    # the null window around the bound player has to beat, which is all a search in it can tell
+    if not null_window:
+        window = alpha, beta
+    elif is_max_player:
+        window = alpha, nextafter(alpha, +inf)
+    else:
+        window = nextafter(beta, -inf), beta
+    if reduced:
+        board_state_value = _late_move_search(
+            depth, player, alpha, beta,
+            lambda child_depth: fail_soft_search(board, child_depth, 1 - player, *window, null_window, context)[0])
+    else:
+        board_state_value, _ = fail_soft_search(board, depth - 1, 1 - player, *window, null_window, context)
+    # a value the reduced search kept is outside the window, so it is never searched again
+    if null_window and alpha < board_state_value < beta:
+        context.researches += 1
+        board_state_value, _ = fail_soft_search(board, depth - 1, 1 - player, alpha, beta, null_window, context)
+    return board_state_value
+
+
+def fail_soft(board, depth, is_max_player, alpha, beta, context):
+    """ Fail-soft alpha-beta, see fail_soft_search.
+
+    :return: (value, best move or None if there is no move to make)
+    """
+    return fail_soft_search(board, depth, COMPUTER if is_max_player else HUMAN, alpha, beta, False, context)
+
+
+def principal_variation_search(board, depth, is_max_player, alpha, beta, context):
+    """ Fail-soft alpha-beta with null window searches of all moves but the first, see fail_soft_search.
+
+    :return: (value, best move or None if there is no move to make)
+    """
+    return fail_soft_search(board, depth, COMPUTER if is_max_player else HUMAN, alpha, beta, True, context)
+
+
+# alpha-beta variants by name, all called as strategy(board, depth, is_max_player, alpha, beta, context)
+STRATEGIES = {
+    'failhard': alpha_beta,
+    'failsoft': fail_soft,
+    'pvs': principal_variation_search,
+}
+
+
+def principal_variation(board, player, move, depth, context):
+    """ The line of play an alpha-beta search expects: its best move, then the best moves its transposition table
+    holds for the positions that follow, up to depth moves in all.
+
+    :param move: Best move the search found for player on board
+    :return: tuple of moves, empty if move is None
+    """
+    if move is None:
+        return ()
+    board = board.copy()
+    variation = [move]
+    move_piece(board, move)
+    player = 1 - player
+    while len(variation) < depth and not is_terminal_state(board):
+        key, mirrored = tt_key(board, player)
+        entry = context.transposition_table.probe(key)
+        if entry is None or entry.move is None:
+            break
+        move = mirror_move(board, entry.move) if mirrored else entry.move
+        if move not in get_valid_moves(board, player):
+            break
+        variation.append(move)
+        move_piece(board, move)
+        player = 1 - player
+    return tuple(variation)
+
+
+def iterative_deepening(board, time_budget_ms, is_max_player, context, max_depth=64, strategy=alpha_beta,
+                        aspiration_window=None):
+    """ Alpha-beta search to depth 1, 2, 3, ... until time_budget_ms runs out.
+
+    Every iteration leaves its best moves in the transposition table, where the next one picks them up to search
+    first. Depth 1 is always completed, so there is a move to return even on a tiny budget.
+
+    With an aspiration window, every iteration after the first searches the window of that half-width around the
+    value of the previous one. A value falling outside it is only a bound, so the iteration is searched again with
+    the window opened on that side.
+
+    :param board:
+    :param time_budget_ms: Wall-clock time allowed for the whole search, in milliseconds; None to always go on to
+     max_depth
+    :param is_max_player:
+    :param context: SearchContext of the search, collecting the statistics of all iterations
+    :param max_depth: Deepest iteration to run when time allows
+    :param strategy: Alpha-beta variant to search every iteration with, one of STRATEGIES
+    :param aspiration_window: Half-width of the window around the previous value, None to search every iteration
+     with a full window
+    :return: (value, best move or None, depth of the last completed iteration)
+    """
+    deadline = inf if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+    best_value, best_move, completed_depth = None, None, 0
+    try:
+        for depth in range(1, max_depth + 1):
+            context.deadline = inf if depth == 1 else deadline
+            # checked after the deadline is set, so a stop from another thread is never overwritten
+            if context.stopped:
+                break
+            alpha, beta = -inf, +inf
+            if aspiration_window is not None and best_value is not None:
+                alpha, beta = best_value - aspiration_window, best_value + aspiration_window
+            while True:
+                # an aborted search leaves its moves made, so every search works on its own copy
+                value, move = strategy(board.copy(), depth, is_max_player, alpha, beta, context)
+                if value <= alpha != -inf:
+                    alpha = -inf
+                elif value >= beta != +inf:
+                    beta = +inf
+                else:
+                    break
+                context.researches += 1
+            best_value, best_move = value, move
+            completed_depth = depth
+            if best_move is None or time.perf_counter() > deadline:
+                break
+    except SearchTimeout:
+        pass
+    finally:
+        context.deadline = inf
+    return best_value, best_move, completed_depth
+
+
+def greedy(board, player, context):
+    """ Best move one ply ahead: the first move reaching the best evaluation for player.
+
+    :return: (value, best move or None if there is no move to make)
+    """
+    context.nodes[1] += 1
+    best_move, best_value = None, -inf if player == COMPUTER else +inf
+    for move in get_valid_moves(board, player):
+        move_piece(board, move)
+        context.nodes[0] += 1
+        value = evaluate(board, 1 - player, context)
+        undo_move(board, move)
+        if value > best_value if player == COMPUTER else value < best_value:
+            best_move, best_value = move, value
+    return best_value, best_move
@@ -0,0 +1,134 @@
+import json
+from collections import Counter
+from math import inf
+
+from .core import COMPUTER, HUMAN, apply_move, print_board
+from .evaluation import simple_evaluation
+from .transposition import TranspositionTable
+
+
+class SearchContext:
+    """ Everything one search uses and records about itself, handed down the recursion instead of kept in globals.
+
+    Searches running at the same time each get their own context. trace, when set, is called as
+    trace(event, board, depth, value, move) for every searched position ('max' or 'min') and every 'prune';
+    left as None it costs a single comparison per position.
+    """
+
+    def __init__(self, trace=None, time_evaluations=False, deadline=inf, evaluation=simple_evaluation,
+                 transposition_table=None, move_ordering=None, tablebase=None, quiescence_depth=0,
+                 late_move_reductions=False, move_cache=None):
+        """
+
+        :param trace: Trace hook, e.g. print_trace, JsonLinesTrace or SampledTrace
+        :param time_evaluations: Measure the time spent in the heuristic, at the cost of two clock reads per leaf
+        :param deadline: time.perf_counter() value past which the search gives up, for searches that support it
+        :param evaluation: evaluation(board, player) of the leaves, e.g. one of evaluation.EVALUATIONS
+        :param transposition_table: Table shared with earlier searches, a new empty one if not given
+        :param move_ordering: MoveOrdering to search moves with, None to only search the stored best move first
+        :param tablebase: Tablebase to take the exact value of the positions it solves from
+        :param quiescence_depth: Plies past the nominal depth to keep searching moves entering a goal row, see
+         search.quiescence
+        :param late_move_reductions: Search quiet moves late in the move order one ply shallower, unless that shows
+         them to be better than the best move so far
+        :param move_cache: MoveCache to take the moves of the positions searched with move ordering from, None to
+         generate them every time
+        """
+        self.trace = trace
+        self.time_evaluations = time_evaluations
+        self.deadline = deadline
+        self.evaluation = evaluation
+        self.transposition_table = TranspositionTable() if transposition_table is None else transposition_table
+        self.move_ordering = move_ordering
+        self.tablebase = tablebase
+        self.quiescence_depth = quiescence_depth
+        self.late_move_reductions = late_move_reductions
+        self.move_cache = move_cache
+        self.stopped = False  # set by stop
+        self.nodes = Counter()  # positions searched, by remaining depth, negative past the nominal depth
+        self.leaves = 0
+        self.prunes = 0
+        self.cutoff_positions = Counter()  # index, in search order, of the move that caused each prune
+        self.evaluation_seconds = 0.0
+        self.tt_probes = self.tt_hits = 0
+        self.researches = 0  # searches repeated with a wider window, by principal variation search or aspiration
+
+    def stop(self):
+        """ Make the search give up at its next check of the deadline, raising SearchTimeout; safe to call from
+        another thread than the one searching.
+        """
+        self.stopped = True
+        self.deadline = -inf
+
+    @property
+    def no_of_nodes(self):
+        return sum(self.nodes.values())
+
+    def first_move_cutoff_rate(self):
+        return self.cutoff_positions[0] / self.prunes if self.prunes else 0.0
+
+    def merge(self, stats):
+        """ Add the counters of another search, given as returned by as_dict, e.g. from a worker process. """
+        self.nodes.update({int(depth): count for depth, count in stats['nodes'].items()})
+        self.leaves += stats['leaves']
+        self.prunes += stats['prunes']
+        self.cutoff_positions.update({int(index): count for index, count in stats['cutoff_positions'].items()})
+        self.evaluation_seconds += stats['evaluation_seconds']
+        self.tt_probes += stats['tt_probes']
+        self.tt_hits += stats['tt_hits']
+        self.researches += stats['researches']
+
+    def as_dict(self):
+        return {
+            'nodes': dict(self.nodes),
+            'no_of_nodes': self.no_of_nodes,
+            'leaves': self.leaves,
+            'prunes': self.prunes,
+            'cutoff_positions': dict(self.cutoff_positions),
+            'first_move_cutoff_rate': self.first_move_cutoff_rate(),
+            'evaluation_seconds': self.evaluation_seconds,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'researches': self.researches,
+        }
+
+
+def print_trace(event, board, depth, value, move):
+    """ Print every searched position the way the engines used to: its value and the board after its best move. """
+    if event == 'prune':
+        print('PRUNING FOR VALUE', value)
+    else:
+        print(f'Heuristic value for {event} board', value)
+    if move is not None:
+        print_board(apply_move(board, move))
+
+
+class JsonLinesTrace:
+    """ Trace hook writing one JSON object per event to a text file. """
+
+    def __init__(self, file):
+        self.file = file
+
+    def __call__(self, event, board, depth, value, move):
+        self.file.write(json.dumps({
+            'event': event,
+            'depth': depth,
+            'value': value,
+            'move': move,
+            'computer': board.pieces[COMPUTER],
+            'human': board.pieces[HUMAN],
+        }) + '\n')
+
+
+class SampledTrace:
+    """ Trace hook passing only every n-th event on to another hook. """
+
+    def __init__(self, hook, every=1000):
+        self.hook = hook
+        self.every = every
+        self.no_of_events = 0
+
+    def __call__(self, event, board, depth, value, move):
+        self.no_of_events += 1
+        if self.no_of_events % self.every == 0:
+            self.hook(event, board, depth, value, move)
@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import BOARD_SIZE, COMPUTER, HUMAN, Board, initial_board, get_winner, get_valid_moves, move_piece
+from .engine import PRESETS
+from .parallel import worker_engine
+
+# requests and responses are single lines of JSON; every request has an 'op', the other fields depend on it:
+#   {"op": "new", "engine": "alphabeta-complex", "board_size": 4}   -> {"game": 1, "state": {...}}
+#   {"op": "move", "game": 1, "move": [12, 8], "time_limit_ms": 500} -> {"game": 1, "computer_move": [...], ...}
+#   {"op": "state", "game": 1}                                       -> {"game": 1, "state": {...}}
+#   {"op": "close", "game": 1}                                       -> {"game": 1, "closed": true}
+# errors come back as {"error": message}, with "busy": true when the server turned the request away for load
+
+def _search(options, pieces, size, player, time_budget_ms):
+    """ Choose a move in a worker process; returns (move, score, depth, nodes). """
+    engine = worker_engine(options, size)
+    result = engine.search(Board(*pieces, size=size), player,
+                           time_budget_ms=time_budget_ms if engine.algorithm in ('alphabeta', 'mcts') else None)
+    return result.move, result.score, result.depth, result.context.no_of_nodes
+
+
+class Game:
+    """ One game against the computer; the human moves first. """
+
+    def __init__(self, game_id, preset, board_size):
+        self.game_id = game_id
+        self.preset = preset
+        self.board = initial_board(board_size)
+        self.plies = 0
+        self.winner = None
+        # a game's moves are handled one at a time, however many connections send them
+        self.lock = asyncio.Lock()
+
+    def finish_if_over(self, player_to_move):
+        """ Record the winner once the game is over; a player left without a move loses. """
+        self.winner = get_winner(self.board, player_to_move)
+        return self.winner is not None
+
+    def state(self):
+        return {
+            'board_size': self.board.size,
+            'computer': self.board.pieces[COMPUTER],
+            'human': self.board.pieces[HUMAN],
+            'plies': self.plies,
+            'winner': {COMPUTER: 'computer', HUMAN: 'human'}.get(self.winner),
+        }
+
+
+class GameServer:
+    """ Hosts any number of games; searches run in a bounded process pool so the event loop never waits on one.
+
+    At most max_pending searches are running or queued for the pool at any time. A move arriving when that many are
+    pending is turned away at once with a busy error rather than queued, so a saturated server answers quickly and
+    clients can back off.
+    """
+
+    def __init__(self, workers=None, max_pending=None, default_time_limit_ms=1000, max_time_limit_ms=10000,
+                 cache_path=None):
+        """
+
+        :param workers: Search processes, defaults to the number of CPUs
+        :param max_pending: Searches allowed to run or wait for a worker at once, defaults to twice the workers
+        :param default_time_limit_ms: Time limit of moves that do not set one
+        :param max_time_limit_ms: Longest time limit a request may ask for
+        :param cache_path: SearchCache file the engines of all workers share
+        """
+        self.workers = workers or os.cpu_count()
+        self.max_pending = max_pending or 2 * self.workers
+        self.default_time_limit_ms = default_time_limit_ms
+        self.max_time_limit_ms = max_time_limit_ms
+        self.cache_path = cache_path
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.games = {}
+        self.pending = 0
+        self._game_ids = itertools.count(1)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def _search_done(self, future):
+        self.pending -= 1
+
+    async def handle(self, request):
+        """ Answer one request, given and answered as a dict. """
+        op = request.get('op')
+        if op == 'new':
+            preset = request.get('engine', 'alphabeta-complex')
+            if preset not in PRESETS:
+                return {'error': f'unknown engine {preset!r}, expected one of {", ".join(PRESETS)}'}
+            board_size = request.get('board_size', BOARD_SIZE)
+            if not isinstance(board_size, int) or not 3 <= board_size <= 16:
+                return {'error': 'board_size must be a whole number from 3 to 16'}
+            game = Game(next(self._game_ids), preset, board_size)
+            self.games[game.game_id] = game
+            return {'game': game.game_id, 'state': game.state()}
+
+        game_id = request.get('game')
+        if not isinstance(game_id, int) or isinstance(game_id, bool):
+            return {'error': f'game must be a game number, not {game_id!r}'}
+        game = self.games.get(game_id)
+        if game is None:
+            return {'error': f'no game {request.get("game")!r}'}
+        if op == 'state':
+            return {'game': game.game_id, 'state': game.state()}
+        if op == 'close':
+            del self.games[game.game_id]
+            return {'game': game.game_id, 'closed': True}
+        if op == 'move':
+            async with game.lock:
+                return await self.move(game, request)
+        return {'error': f'unknown op {op!r}'}
+
+    async def move(self, game, request):
+        if game.winner is not None:
+            return {'error': 'the game is over', 'game': game.game_id, 'state': game.state()}
+        move = request.get('move')
+        move = tuple(move) if isinstance(move, list) else None
+        if move not in get_valid_moves(game.board, HUMAN):
+            return {'error': f'{request.get("move")!r} is not a valid move', 'game': game.game_id}
+        time_limit_ms = request.get('time_limit_ms', self.default_time_limit_ms)
+        if not isinstance(time_limit_ms, (int, float)) or time_limit_ms <= 0:
+            return {'error': 'time_limit_ms must be a positive number', 'game': game.game_id}
+        time_limit_ms = min(time_limit_ms, self.max_time_limit_ms)
+        # the search is checked before the human move is made, so a turned away request leaves the game as it was
+        if self.pending >= self.max_pending:
+            return {'error': 'server busy, retry later', 'busy': True, 'game': game.game_id}
+
+        move_piece(game.board, move)
+        game.plies += 1
+        if game.finish_if_over(COMPUTER):
+            return {'game': game.game_id, 'computer_move': None, 'state': game.state()}
+
+        # iterative deepening keeps to its budget up to one node; the rest of the limit covers the round trip
+        search = asyncio.get_running_loop().run_in_executor(
+            self.pool, _search, dict(PRESETS[game.preset], cache_path=self.cache_path), tuple(game.board.pieces),
+            game.board.size, COMPUTER, time_limit_ms * 0.8)
+        # a search stays pending until its worker is free again, also when the request has given up on it
+        self.pending += 1
+        search.add_done_callback(self._search_done)
+        try:
+            computer_move, score, depth, nodes = await asyncio.wait_for(asyncio.shield(search),
+                                                                        time_limit_ms / 1000 + 1)
+        except asyncio.TimeoutError:
+            # the worker can not be interrupted; its result is dropped and the human move taken back
+            move_piece(game.board, (move[1], move[0]))
+            game.plies -= 1
+            return {'error': 'search timed out', 'game': game.game_id}
+
+        move_piece(game.board, computer_move)
+        game.plies += 1
+        game.finish_if_over(HUMAN)
+        return {
+            'game': game.game_id,
+            'computer_move': list(computer_move),
+            'score': score,
+            'depth': depth,
+            'nodes': nodes,
+            'state': game.state(),
+        }
+
+    async def serve_connection(self, reader, writer):
+        """ Answer the requests of one connection in order, one JSON line each. """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'error': 'requests must be one JSON object per line'}
+                else:
+                    try:
+                        response = (await self.handle(request) if isinstance(request, dict)
+                                    else {'error': 'requests must be JSON objects'})
+                    except Exception as error:
+                        # one bad request must not cost the client its connection
+                        traceback.print_exc()
+                        response = {'error': f'request failed: {type(error).__name__}: {error}'}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, max_pending=None, default_time_limit_ms=1000,
+                cache_path=None):
+    game_server = GameServer(workers, max_pending, default_time_limit_ms, cache_path=cache_path)
+    server = await asyncio.start_server(game_server.serve_connection, host, port)
+    print(f'Serving games on {host}:{port} with {game_server.workers} search processes, '
+          f'at most {game_server.max_pending} searches pending')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Host games against the computer over TCP, one JSON object per line.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, help='search processes, defaults to the CPU count')
+    parser.add_argument('--max-pending', type=int, help='searches running or queued before moves are turned away')
+    parser.add_argument('--time-limit-ms', type=int, default=1000, help='time limit of moves that do not set one')
+    parser.add_argument('--cache', help='search cache file shared by the workers, see checkers.warmup')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending, args.time_limit_ms, args.cache))
+    except KeyboardInterrupt:
+        pass
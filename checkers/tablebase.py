@@ -0,0 +1,219 @@
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+from itertools import combinations
+
+from .core import BOARD_SIZE, GEOMETRY, COMPUTER, HUMAN, SQUARES, ROW_MASKS, NEIGHBORS, get_valid_moves
+
+WIN, LOSS, DRAW = 1, -1, 0
+# tablebase scores are far outside the heuristics' range, and a quicker win scores higher
+TABLEBASE_WIN = 1000
+
+# files indexed by every computer mask rather than canonical ones had magic CKTB and have to be rebuilt
+_MAGIC = b'CKT2'
+# magic, board size, pieces per player, bytes per value
+_HEADER = struct.Struct('<4sBBB1x')
+
+# every position has BOARD_SIZE pieces per player; a player's pieces are indexed by their rank among all such masks
+MASKS = [sum(1 << s for s in chosen) for chosen in combinations(SQUARES, BOARD_SIZE)]
+RANK = {mask: rank for rank, mask in enumerate(MASKS)}
+MIRROR = {mask: GEOMETRY.mirror_mask(mask) for mask in MASKS}
+# a position and its mirror image have the same value, so only the orientation whose computer mask - or, when that is
+# symmetric, human mask - ranks lower is stored; the table is indexed by the computer masks ranking no higher than
+# their mirror image, a little over half of them
+CANONICAL_MASKS = [mask for mask in MASKS if RANK[mask] <= RANK[MIRROR[mask]]]
+CANONICAL_RANK = {mask: rank for rank, mask in enumerate(CANONICAL_MASKS)}
+_HUMAN_GOAL, _COMPUTER_GOAL = ROW_MASKS[0], ROW_MASKS[BOARD_SIZE - 1]
+
+
+def state_index(computer, human, player):
+    if computer not in CANONICAL_RANK or MIRROR[computer] == computer and RANK[MIRROR[human]] < RANK[human]:
+        computer, human = MIRROR[computer], MIRROR[human]
+    return (player * len(CANONICAL_MASKS) + CANONICAL_RANK[computer]) * len(MASKS) + RANK[human]
+
+
+def _state(index):
+    """ (computer, human, player to move) of a stored position, the inverse of state_index. """
+    player, rest = divmod(index, len(CANONICAL_MASKS) * len(MASKS))
+    return CANONICAL_MASKS[rest // len(MASKS)], MASKS[rest % len(MASKS)], player
+
+
+# a stored value is 0 for a draw, 2 * d + 1 for a win in d plies and 2 * d + 2 for a loss in d plies,
+# always from the point of view of the player to move
+def encode(result, distance):
+    return DRAW if result == DRAW else 2 * distance + (1 if result == WIN else 2)
+
+
+def decode(value):
+    if value == 0:
+        return DRAW, 0
+    return (WIN, (value - 1) // 2) if value % 2 else (LOSS, (value - 2) // 2)
+
+
+def _moves(own, occupied):
+    """ Bitmasks (from | to) of every move of the pieces in own. """
+    while own:
+        low = own & -own
+        own ^= low
+        for move, bit in NEIGHBORS[low.bit_length() - 1]:
+            if not occupied & bit:
+                yield low | bit
+
+
+def solve(verbose=False):
+    """ Retrograde analysis of every position with BOARD_SIZE pieces per player.
+
+    Terminal positions and positions whose player to move has no move (which the engines score as lost) are resolved
+    first. Going backwards from resolved positions, a position is won as soon as one move reaches a position lost for
+    the opponent, and lost once every one of its moves reaches a position won for the opponent. Resolving in order of
+    distance makes wins as short and losses as long as possible. Whatever is never resolved is a draw.
+
+    A position and its mirror image are one stored position, so moves are counted by the stored position they reach:
+    two moves reaching mirror images of each other count once.
+
+    :return: array of encoded values indexed by state_index
+    """
+    no_of_states = 2 * len(CANONICAL_MASKS) * len(MASKS)
+    values = array('H', bytes(2 * no_of_states))
+    # number of stored positions reached by a position's moves that still have to be found won for the opponent
+    # before it is lost
+    remaining = array('B', bytes(no_of_states))
+    queue = deque()
+    for computer in CANONICAL_MASKS:
+        for human in MASKS:
+            if computer & human or MIRROR[computer] == computer and RANK[MIRROR[human]] < RANK[human]:
+                continue  # overlapping, or stored as its mirror image
+            human_done = human & _HUMAN_GOAL == _HUMAN_GOAL
+            computer_done = computer & _COMPUTER_GOAL == _COMPUTER_GOAL
+            for player in (COMPUTER, HUMAN):
+                index = state_index(computer, human, player)
+                if human_done or computer_done:
+                    if human_done != computer_done:  # both goals full can not be reached, it is left a draw
+                        winner = HUMAN if human_done else COMPUTER
+                        values[index] = encode(WIN if winner == player else LOSS, 0)
+                        queue.append(index)
+                    continue
+                pieces = [computer, human]
+                children = set()
+                for move_mask in _moves(pieces[player], computer | human):
+                    pieces[player] ^= move_mask
+                    children.add(state_index(pieces[COMPUTER], pieces[HUMAN], 1 - player))
+                    pieces[player] ^= move_mask
+                if children:
+                    remaining[index] = len(children)
+                else:
+                    values[index] = encode(LOSS, 0)
+                    queue.append(index)
+    if verbose:
+        print(f'{len(queue)} positions resolved without a move')
+
+    while queue:
+        index = queue.popleft()
+        result, distance = decode(values[index])
+        computer, human, player = _state(index)
+        # moves can be walked back the same way, so the opponent's moves from here lead to the positions before; the
+        # position stands for its mirror image too, whose positions before are looked for as well
+        opponent = 1 - player
+        previous_positions = set()
+        for pieces in ([computer, human], [MIRROR[computer], MIRROR[human]]):
+            for move_mask in _moves(pieces[opponent], pieces[COMPUTER] | pieces[HUMAN]):
+                pieces[opponent] ^= move_mask
+                previous_positions.add(state_index(pieces[COMPUTER], pieces[HUMAN], opponent))
+                pieces[opponent] ^= move_mask
+        for previous in previous_positions:
+            if values[previous] or not remaining[previous]:
+                continue
+            if result == LOSS:
+                values[previous] = encode(WIN, distance + 1)
+                queue.append(previous)
+            else:
+                remaining[previous] -= 1
+                if not remaining[previous]:
+                    values[previous] = encode(LOSS, distance + 1)
+                    queue.append(previous)
+    return values
+
+
+def write_tablebase(path, values):
+    # on 4x4 no game lasts long enough for a value to need a second byte
+    values = array('B' if max(values) < 256 else 'H', values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, BOARD_SIZE, BOARD_SIZE, values.itemsize))
+        values.tofile(file)
+
+
+class Tablebase:
+    """ Memory-mapped tablebase file written by write_tablebase; every probe reads a single value. """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, board_size, no_of_pieces, self._itemsize = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or board_size != BOARD_SIZE or no_of_pieces != BOARD_SIZE:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a tablebase for a {BOARD_SIZE}x{BOARD_SIZE} board')
+        self._values = memoryview(self._mmap)[_HEADER.size:].cast('B' if self._itemsize == 1 else 'H')
+
+    def probe(self, board, player):
+        """
+
+        :param board:
+        :param player: Player to move
+        :return: (WIN, LOSS or DRAW for player, distance in plies to the end), None for positions not in the table
+        """
+        computer, human = board.pieces
+        if board.geometry is not GEOMETRY or computer not in RANK or human not in RANK:
+            return None
+        value = self._values[state_index(computer, human, player)]
+        if self._itemsize == 2 and sys.byteorder == 'big':
+            value = int.from_bytes(value.to_bytes(2, 'big'), 'little')
+        return decode(value)
+
+    def score(self, board, player):
+        """ Value of a won or lost position for the computer, on the scale of the engines' heuristics.
+
+        Draws get None like positions not in the table, so the engines keep telling good draws from bad ones with their
+        heuristic.
+        """
+        probe = self.probe(board, player)
+        if probe is None or probe[0] == DRAW:
+            return None
+        result, distance = probe
+        score = TABLEBASE_WIN - distance
+        return score if (result == WIN) == (player == COMPUTER) else -score
+
+    def best_move(self, board, player):
+        """ Perfect move for player in a won or lost position: the quickest win or the slowest loss.
+
+        None in drawn positions, where every move that keeps the draw is as good, and in positions not in the table.
+        """
+        probe = self.probe(board, player)
+        if probe is None or probe[0] == DRAW:
+            return None
+        best_move, best_rank = None, None
+        for move in get_valid_moves(board, player):
+            child = board.copy()
+            child.pieces[player] ^= (1 << move[0]) | (1 << move[1])
+            probe = self.probe(child, 1 - player)
+            if probe is None:
+                return None
+            result, distance = probe
+            # the opponent is to move after the move: their loss is our win
+            rank = (-result, -distance if result == LOSS else distance)
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = move, rank
+        return best_move
+
+    def close(self):
+        self._values.release()
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    output_path = sys.argv[1] if len(sys.argv) > 1 else f'tablebase_{BOARD_SIZE}x{BOARD_SIZE}.bin'
+    write_tablebase(output_path, solve(verbose=True))
+    print(f'Tablebase written to {output_path}')
@@ -0,0 +1,85 @@
+from collections import namedtuple
+
+# what an entry's value says about the real value of its position
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+TTEntry = namedtuple('TTEntry', 'key depth value flag move')
+
+
+def replace_always(old_entry, new_entry):
+    return True
+
+
+def replace_if_deeper(old_entry, new_entry):
+    return new_entry.depth >= old_entry.depth
+
+
+# replacement policies decide whether new_entry may evict the entry already stored in its slot
+REPLACEMENT_POLICIES = {
+    'always': replace_always,
+    'depth': replace_if_deeper,
+}
+
+
+class TranspositionTable:
+    """ Fixed size table of search results indexed by Zobrist key.
+
+    Every key maps to a single slot, key % capacity. A slot holding a different key counts as a collision on probe,
+    and on store the replacement policy decides which of the two entries is kept.
+    """
+
+    def __init__(self, capacity=1 << 16, replacement='depth'):
+        """
+
+        :param capacity: Number of slots
+        :param replacement: Name from REPLACEMENT_POLICIES, or a function (old_entry, new_entry) -> bool
+        """
+        self.capacity = capacity
+        self.replace = REPLACEMENT_POLICIES[replacement] if isinstance(replacement, str) else replacement
+        self.entries = [None] * capacity
+        self.hits = self.misses = self.collisions = 0
+
+    def probe(self, key):
+        entry = self.entries[key % self.capacity]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.key != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, flag, move):
+        index = key % self.capacity
+        new_entry = TTEntry(key, depth, value, flag, move)
+        old_entry = self.entries[index]
+        if old_entry is None or self.replace(old_entry, new_entry):
+            self.entries[index] = new_entry
+
+    def clear(self):
+        self.entries = [None] * self.capacity
+        self.hits = self.misses = self.collisions = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.entries)
+
+
+def bound_flag(value, alpha, beta):
+    """ Flag for a fail-hard search result, given the window (alpha, beta) the node was searched with. """
+    if value <= alpha:
+        return UPPER_BOUND
+    if value >= beta:
+        return LOWER_BOUND
+    return EXACT
+
+
+def probe_cutoff(entry, depth, alpha, beta):
+    """ Whether a stored entry is deep enough and tight enough to answer a search of (depth, alpha, beta). """
+    if entry is None or entry.depth < depth:
+        return False
+    if entry.flag == EXACT:
+        return True
+    if entry.flag == LOWER_BOUND:
+        return entry.value >= beta
+    return entry.value <= alpha
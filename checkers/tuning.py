@@ -0,0 +1,127 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import BOARD_SIZE, COMPUTER, HUMAN, initial_board, get_winner, get_valid_moves, move_piece
+from .engine import Engine
+from .evaluation import FEATURES, get_features, write_weights
+from .tablebase import WIN, DRAW, Tablebase
+
+
+def self_play(seed, games, depth, opening_plies=4, random_move_rate=0.1, max_plies=200, board_size=BOARD_SIZE,
+              tablebase_path=None):
+    """ Play games between two alpha-beta engines searching depth plies and label the positions they reach.
+
+    The first opening_plies moves of every game, and random_move_rate of the others, are random, drawn from seed, so
+    the games differ and reach decisive positions. A position is labelled with its exact value when a tablebase
+    solves it, and with the result of its game otherwise.
+
+    :return: (features of every position after the opening, its label: the chance of the computer winning, 1 for a
+     win, 0.5 for a draw, 0 for a loss)
+    """
+    rng = random.Random(seed)
+    engine = Engine('alphabeta', 'simple', depth)
+    tablebase = None if tablebase_path is None else Tablebase(tablebase_path)
+    features, labels = [], []
+    for _ in range(games):
+        board, player, game_labels, winner = initial_board(board_size), HUMAN, [], None
+        for ply in range(max_plies):
+            winner = get_winner(board, player)
+            if winner is not None:
+                break
+            if ply >= opening_plies:
+                features.append(get_features(board, player))
+                game_labels.append(_exact_label(tablebase, board, player))
+            if ply < opening_plies or rng.random() < random_move_rate:
+                move = rng.choice(get_valid_moves(board, player))
+            else:
+                move = engine.search(board, player).move
+            move_piece(board, move)
+            player = 1 - player
+        result = 0.5 if winner is None else 1.0 if winner == COMPUTER else 0.0
+        labels += [result if label is None else label for label in game_labels]
+    return features, labels
+
+
+def _exact_label(tablebase, board, player):
+    probe = None if tablebase is None else tablebase.probe(board, player)
+    if probe is None:
+        return None
+    result, _ = probe
+    return 0.5 if result == DRAW else 1.0 if (result == WIN) == (player == COMPUTER) else 0.0
+
+
+def generate(games, depth, workers=None, seed=0, opening_plies=4, random_move_rate=0.1, max_plies=200,
+             board_size=BOARD_SIZE, tablebase_path=None):
+    """ Run self_play in worker processes, a share of the games each.
+
+    :return: (features array of shape (positions, len(FEATURES)), labels array)
+    """
+    workers = workers or os.cpu_count()
+    shares = [games // workers + (worker < games % workers) for worker in range(workers)]
+    features, labels = [], []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(self_play, seed + worker, share, depth, opening_plies, random_move_rate, max_plies,
+                               board_size, tablebase_path)
+                   for worker, share in enumerate(shares) if share]
+        for future in futures:
+            worker_features, worker_labels = future.result()
+            features += worker_features
+            labels += worker_labels
+    return np.array(features, dtype=np.float64).reshape(-1, len(FEATURES)), np.array(labels)
+
+
+def fit(features, labels, iterations=5000, learning_rate=0.1, regularization=1e-4):
+    """ Texel tuning: the weights whose evaluation, through a sigmoid, best predicts the labels of the positions.
+
+    Minimizes the mean squared error between sigmoid(features @ weights) and labels by gradient descent, on features
+    scaled to unit spread so one learning rate suits them all.
+
+    :return: (weights, mean squared error)
+    """
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    scaled = features / scale
+    weights = np.zeros(features.shape[1])
+    for _ in range(iterations):
+        predictions = 1 / (1 + np.exp(-scaled @ weights))
+        errors = predictions - labels
+        gradient = scaled.T @ (errors * predictions * (1 - predictions)) * 2 / len(labels) + regularization * weights
+        weights -= learning_rate * gradient * len(FEATURES)
+    predictions = 1 / (1 + np.exp(-scaled @ weights))
+    return weights / scale, float(np.mean((predictions - labels) ** 2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fit the weights of the weighted evaluation to self-play games.')
+    parser.add_argument('path', help='weight file to write, see evaluation.load_weights')
+    parser.add_argument('--version', help='name of the weights, a timestamp by default')
+    parser.add_argument('--games', type=int, default=400)
+    parser.add_argument('--depth', type=int, default=6, help='depth the self-play engines search to')
+    parser.add_argument('--opening-plies', type=int, default=4, help='random moves at the start of every game')
+    parser.add_argument('--random-move-rate', type=float, default=0.1, help='share of the other moves made at random')
+    parser.add_argument('--tablebase', help='tablebase to label the positions it solves with their exact value')
+    parser.add_argument('--max-plies', type=int, default=200, help='games this long are called a draw')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--workers', type=int, help='self-play processes, defaults to the CPU count')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    game_features, game_labels = generate(args.games, args.depth, args.workers, args.seed, args.opening_plies,
+                                          args.random_move_rate, args.max_plies, args.board_size, args.tablebase)
+    print(f'{len(game_labels)} positions from {args.games} games in {time.perf_counter() - start:.1f}s')
+    fitted_weights, error = fit(game_features, game_labels)
+    version = args.version or time.strftime('%Y%m%d-%H%M%S')
+    write_weights(args.path, [round(float(weight), 6) for weight in fitted_weights], version,
+                  board_size=args.board_size, games=args.games, positions=len(game_labels), depth=args.depth,
+                  opening_plies=args.opening_plies, random_move_rate=args.random_move_rate,
+                  labels='tablebase' if args.tablebase else 'game results', seed=args.seed,
+                  mean_squared_error=error)
+    print(f'Weights {version} written to {args.path}, mean squared error {error:.4f}:')
+    for name, weight in zip(FEATURES, fitted_weights):
+        print(f'  {name:18} {weight:+.4f}')
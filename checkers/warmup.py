@@ -0,0 +1,54 @@
+import argparse
+import time
+
+from .core import BOARD_SIZE, HUMAN, initial_board, is_terminal_state, get_valid_moves, apply_move
+from .engine import PRESETS, Engine
+
+
+def opening_positions(plies, size=BOARD_SIZE):
+    """ Every (board, player to move) reachable in at most plies moves from the start, the human moving first. """
+    # breadth first, so every position is expanded from the fewest moves it can be reached in
+    positions = [(initial_board(size), HUMAN)]
+    seen = set(positions)
+    frontier = list(positions)
+    for _ in range(plies):
+        next_frontier = []
+        for board, player in frontier:
+            if is_terminal_state(board):
+                continue
+            for move in get_valid_moves(board, player):
+                position = (apply_move(board, move), 1 - player)
+                if position not in seen:
+                    seen.add(position)
+                    next_frontier.append(position)
+        positions += next_frontier
+        frontier = next_frontier
+    return positions
+
+
+def warm_up(engine, plies, depth=None, size=BOARD_SIZE, verbose=False):
+    """ Search every position of the first plies moves with engine, which stores them in its cache.
+
+    :return: Number of positions searched
+    """
+    positions = opening_positions(plies, size)
+    start = time.perf_counter()
+    for index, (board, player) in enumerate(positions, 1):
+        engine.search(board, player, depth)
+        if verbose and index % 100 == 0:
+            print(f'{index}/{len(positions)} positions, {time.perf_counter() - start:.1f}s')
+    return len(positions)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fill a search cache with the positions of the opening.')
+    parser.add_argument('path', help='SQLite file of the cache, created if missing')
+    parser.add_argument('--engine', choices=PRESETS, default='alphabeta-complex')
+    parser.add_argument('--depth', type=int, help="depth to search to, the engine's own by default")
+    parser.add_argument('--plies', type=int, default=4, help='positions up to this many moves from the start')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE)
+    args = parser.parse_args()
+
+    warm_engine = Engine(**dict(PRESETS[args.engine], cache_path=args.path))
+    no_of_positions = warm_up(warm_engine, args.plies, args.depth, args.board_size, verbose=True)
+    print(f'{no_of_positions} positions searched, {len(warm_engine.cache)} in {args.path}')
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from checkers.core import (COMPUTER, HUMAN, Board, initial_board, get_valid_moves, move_piece, undo_move,
+                           scan_advances, scan_advancing_moves)
+from checkers.evaluation import get_simple_heuristic, get_complex_heuristic
+
+STEPS = 300
+
+
+def outcome(function, *args):
+    """ Value of function, or the type of the exception it raises. """
+    try:
+        return function(*args)
+    except ArithmeticError as error:
+        return type(error)
+
+
+def check_against_scan(board):
+    computer, human, size = board.pieces[COMPUTER], board.pieces[HUMAN], board.size
+    fresh = Board(computer, human, size=size)
+    assert board.key == fresh.key
+    assert board.mirror_key == fresh.mirror_key
+    assert board.advances == scan_advances(computer, human, size)
+    assert board.advancing == [scan_advancing_moves(computer, human, player, size) for player in (COMPUTER, HUMAN)]
+    assert get_simple_heuristic(board) == get_simple_heuristic(fresh)
+    for player in (COMPUTER, HUMAN):
+        assert outcome(get_complex_heuristic, board, player) == outcome(get_complex_heuristic, fresh, player)
+
+
+@pytest.mark.parametrize('size', range(3, 11))
+def test_moves_and_undos_keep_the_board_up_to_date(size):
+    rng = random.Random(size)
+    board, player, made = initial_board(size), HUMAN, []
+    check_against_scan(board)
+    for _ in range(STEPS):
+        moves = get_valid_moves(board, player)
+        # undo now and then, and whenever the player to move is stuck
+        if made and (not moves or rng.random() < 0.3):
+            undo_move(board, made.pop())
+            player = 1 - player
+        elif moves:
+            move = rng.choice(moves)
+            move_piece(board, move)
+            made.append(move)
+            player = 1 - player
+        else:
+            break
+        check_against_scan(board)
+    while made:
+        undo_move(board, made.pop())
+        check_against_scan(board)
+    assert board == initial_board(size)
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from checkers.benchmark import CORPUS
+from checkers.core import HUMAN, initial_board, get_valid_moves, move_piece
+from checkers.engine import PRESETS, Engine
+from checkers.parallel import parallel_search
+
+
+def random_positions(size, count, seed):
+    """ (board, player to move) of count positions reached by random play on a size x size board. """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, player = initial_board(size), HUMAN
+        for _ in range(rng.randrange(2, 12)):
+            moves = get_valid_moves(board, player)
+            if not moves:
+                break
+            move_piece(board, rng.choice(moves))
+            player = 1 - player
+        if get_valid_moves(board, player):
+            positions.append((board, player))
+    return positions
+
+
+POSITIONS = [(board, player) for _, board, player in CORPUS] + random_positions(6, 4, seed=0)
+
+
+@pytest.mark.parametrize('preset', ['minimax', 'alphabeta', 'alphabeta-complex', 'failsoft', 'pvs'])
+@pytest.mark.parametrize('depth', [None, 5])
+def test_parallel_search_chooses_the_sequential_move(preset, depth):
+    if preset == 'minimax' and depth is not None:
+        pytest.skip('plain minimax is too slow that deep')
+    for board, player in POSITIONS:
+        sequential = Engine(**PRESETS[preset]).search(board.copy(), player, depth)
+        parallel = parallel_search(Engine(**PRESETS[preset]), board.copy(), player, depth, workers=2)
+        assert (parallel.move, parallel.score) == (sequential.move, sequential.score)
+
+
+def test_parallel_search_runs_mcts_engines_as_parallel_mcts():
+    board, player = POSITIONS[0]
+    result = parallel_search(Engine(**PRESETS['mcts']), board.copy(), player, 100, workers=2)
+    assert result.move in get_valid_moves(board, player)
+    # depth is the number of playouts of each worker, which the result adds up
+    assert result.depth == 200
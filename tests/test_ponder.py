@@ -0,0 +1,28 @@
+import time
+
+from checkers.core import COMPUTER, HUMAN, initial_board, apply_move, get_valid_moves
+from checkers.engine import Engine
+from checkers.ponder import Ponderer
+
+
+def test_pondering_with_a_search_cache_replies(tmp_path):
+    engine = Engine(depth=4, cache_path=str(tmp_path / 'cache.db'))
+    board = initial_board()
+    ponderer = Ponderer(engine)
+    ponderer.start(board, HUMAN)
+    deadline = time.monotonic() + 30
+    while not ponderer.replies and time.monotonic() < deadline:
+        time.sleep(0.01)
+    positions = [apply_move(board, move) for move in get_valid_moves(board, HUMAN)]
+    pondered = [position for position in positions
+                if (position.pieces[COMPUTER], position.pieces[HUMAN]) in ponderer.replies]
+    assert pondered
+
+    after = pondered[0]
+    result = ponderer.reply(after)
+    assert ponderer.hits == 1
+    assert result.move in get_valid_moves(after, COMPUTER)
+    # the background search stored its result in the cache, where the next engine finds it
+    assert len(engine.cache) > 0
+    engine.cache.close()
+    assert Engine(depth=4, cache_path=str(tmp_path / 'cache.db')).search(after, COMPUTER).move == result.move